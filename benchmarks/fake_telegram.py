@@ -0,0 +1,108 @@
+import asyncio
+import random
+import shutil
+import zlib
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from telethon.errors import FloodWaitError
+from telethon.tl.types import MessageMediaPhoto, InputPeerChannel
+from benchmarks.synthetic import generate_messages
+
+
+class FakeTelegramClient:
+    """
+    Offline stand-in for TelegramClient covering the calls TelegramScraper makes:
+    start, get_entity, iter_messages, download_media and disconnect.
+    Messages come from the synthetic generator and media downloads copy a local image.
+    Like Telegram, iter_messages accepts an InputPeerChannel only for a channel id this
+    client has resolved (or was given in `channels`), and otherwise raises ValueError.
+    """
+    def __init__(self, messages_per_channel: int = 1000, sample_image: str = None,
+                 flood_wait_rate: float = 0.0, flood_wait_seconds: int = 0,
+                 latency: float = 0.0, seed: int = 0, channels=None):
+        """
+        Initialize the fake client.
+
+        Args:
+            messages_per_channel (int): Messages each channel returns.
+            sample_image (str): Image copied for every download_media call.
+            flood_wait_rate (float): Probability that get_entity raises FloodWaitError.
+            flood_wait_seconds (int): Seconds reported by the injected FloodWaitError.
+            latency (float): Simulated network round-trip in seconds per call.
+            seed (int): Random seed for message content and error injection.
+            channels (list): Usernames whose ids are known up front, as if resolved in an earlier session.
+        """
+        self.messages_per_channel = messages_per_channel
+        self.sample_image = sample_image
+        self.flood_wait_rate = flood_wait_rate
+        self.flood_wait_seconds = flood_wait_seconds
+        self.latency = latency
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self.calls = {'get_entity': 0, 'iter_messages': 0, 'download_media': 0, 'flood_waits': 0}
+        self._usernames = {}
+        for channel_name in channels or []:
+            self._channel(channel_name)
+
+    def _channel(self, channel_name):
+        username = channel_name.replace('@', '')
+        channel_id = zlib.crc32(username.encode())
+        self._usernames[channel_id] = username
+        return SimpleNamespace(id=channel_id, access_hash=0, username=username, title=username)
+
+    async def _round_trip(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def start(self, phone=None):
+        return self
+
+    async def disconnect(self):
+        pass
+
+    async def get_entity(self, channel_name):
+        self.calls['get_entity'] += 1
+        await self._round_trip()
+        if self._rng.random() < self.flood_wait_rate:
+            self.calls['flood_waits'] += 1
+            raise FloodWaitError(request=None, capture=self.flood_wait_seconds)
+        return self._channel(channel_name)
+
+    async def iter_messages(self, entity, limit=None, offset_date=None):
+        self.calls['iter_messages'] += 1
+        if isinstance(entity, InputPeerChannel):
+            if entity.channel_id not in self._usernames:
+                raise ValueError(f"Could not find the input entity for PeerChannel(channel_id={entity.channel_id})")
+            username = self._usernames[entity.channel_id]
+        else:
+            username = entity.username
+        start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        records = generate_messages(username, self.messages_per_channel, start_date, self.seed)
+        for i, record in enumerate(records):
+            if limit is not None and i >= limit:
+                break
+            date = datetime.fromisoformat(record['message_date'])
+            if offset_date and date >= offset_date:
+                continue
+            # Telethon fetches history in pages of 100 messages
+            if i % 100 == 0:
+                await self._round_trip()
+            yield SimpleNamespace(
+                id=record['message_id'],
+                text=record['message_text'],
+                date=date,
+                media=MessageMediaPhoto() if record['has_media'] else None,
+                views=record['raw_data']['views'],
+                forwards=record['raw_data']['forwards'],
+                replies=None,
+                grouped_id=None,
+            )
+
+    async def download_media(self, message, file=None):
+        self.calls['download_media'] += 1
+        await self._round_trip()
+        if self.sample_image:
+            shutil.copyfile(self.sample_image, file)
+        else:
+            open(file, 'wb').close()
+        return file
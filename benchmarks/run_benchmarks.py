@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the pipeline.
+
+Generates a synthetic raw layer, scrapes it through a fake Telegram client, and times
+DataLoader, YOLODetector and every API endpoint against a local Postgres database.
+Results are written to benchmarks/results/ and compared against benchmarks/baseline.json.
+
+    python -m benchmarks.run_benchmarks --scale small
+    python -m benchmarks.run_benchmarks --scale small --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+SCALES = {
+    'small': {'channels': 3, 'messages': 500, 'images': 20, 'scrape_messages': 50},
+    'medium': {'channels': 5, 'messages': 5000, 'images': 100, 'scrape_messages': 200},
+    'large': {'channels': 10, 'messages': 50000, 'images': 500, 'scrape_messages': 1000},
+}
+
+
+def timed(fn, repeat, setup=None):
+    """
+    Time fn() over several repetitions, running setup() untimed before each one.
+
+    Returns:
+        Dict[str, Any]: Wall-time statistics in seconds and the last return value.
+    """
+    times, result = [], None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return {
+        'median': statistics.median(times),
+        'min': min(times),
+        'max': max(times),
+        'repeat': repeat,
+        'result': result,
+    }
+
+
+def bench_scraper(workdir, channels, scale, sample_image, flood_wait_rate, repeat):
+    """
+    Scrape every channel through the fake client, including media downloads and injected flood waits.
+    The entity cache outlives the repetitions, so only the first one resolves channel usernames.
+    """
+    from benchmarks.fake_telegram import FakeTelegramClient
+    from src.scraping.entity_cache import EntityCache
+    from src.scraping.telegram_scraper import TelegramScraper
+
+    entity_cache = EntityCache(os.path.join(workdir, 'telegram_entities.json'))
+
+    async def scrape():
+        scraper = TelegramScraper(client=FakeTelegramClient(
+            messages_per_channel=scale['scrape_messages'], sample_image=sample_image,
+            flood_wait_rate=flood_wait_rate, channels=channels), entity_cache=entity_cache)
+        total = 0
+        for channel in channels:
+            messages = await scraper.scrape_channel(channel, limit=scale['scrape_messages'])
+            scraper.save_to_json(messages, channel)
+            total += len(messages)
+        return total
+
+    # Scrape into a fresh directory each time so every repetition downloads its media
+    scrape_dir = os.path.join(workdir, 'scrape')
+
+    def reset():
+        os.chdir(workdir)
+        shutil.rmtree(scrape_dir, ignore_errors=True)
+        os.makedirs(scrape_dir)
+        os.chdir(scrape_dir)
+
+    cwd = os.getcwd()
+    try:
+        return timed(lambda: asyncio.run(scrape()), repeat, setup=reset)
+    finally:
+        os.chdir(cwd)
+
+
+def bench_loader(json_files, repeat):
+    """Load every synthetic JSON file, with its extracted prices, into empty raw tables."""
+    from sqlalchemy import text
+    from src.scraping.data_loader import DataLoader
+
+    loader = DataLoader()
+
+    def truncate():
+        with loader.engine.connect() as conn:
+            conn.execute(text("TRUNCATE raw.telegram_messages, raw.message_prices"))
+            conn.commit()
+
+    return timed(lambda: sum(loader.load_json_to_postgres(f) for f in json_files), repeat, setup=truncate)
+
+
+def bench_detector(image_dir, repeat):
+    """
+    Run detection over every synthetic image into an empty raw.image_detections.
+    When the image cache is enabled it is filled untimed before every repetition, as the
+    scraper does at download time, so all repetitions measure the same warm-cache path.
+    """
+    import glob
+    from sqlalchemy import text
+    from src.enrichment.yolo_detector import YOLODetector
+
+    detector = YOLODetector()
+    detector.create_detections_table()
+    image_files = glob.glob(os.path.join(image_dir, "**", "*.jpg"), recursive=True)
+
+    def setup():
+        with detector.engine.connect() as conn:
+            conn.execute(text("TRUNCATE raw.image_detections"))
+            conn.commit()
+        if detector.cache is not None:
+            for image_path in image_files:
+                detector.cache.ensure(image_path)
+
+    return timed(lambda: detector.process_images(image_dir), repeat, setup=setup)
+
+
+def bench_api(channel, repeat):
+    """Time each API endpoint in-process against the freshly built marts."""
+    from fastapi.testclient import TestClient
+    from src.api.main import app
+    from src.transformation.dbt_runner import DbtRunner
+
+    DbtRunner().build(full_refresh=True)
+    client = TestClient(app)
+    endpoints = {
+        'api_top_products': "/api/reports/top-products?limit=10",
+        'api_channel_activity': f"/api/channels/{channel}/activity",
+        'api_search_messages': "/api/search/messages?query=vitamin&limit=50",
+        'api_overview_stats': "/api/stats/overview",
+        'api_product_prices': "/api/reports/product-prices?days=3650",
+    }
+    results = {}
+    for name, url in endpoints.items():
+        def fetch():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+
+        fetch()  # Warm up connections and query plans
+        results[name] = timed(fetch, repeat)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return benchmarks whose median is more than `threshold` slower than the baseline."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        ratio = current['median'] / base['median'] if base['median'] else 1.0
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"  {name:28s} {base['median']:9.4f}s -> {current['median']:9.4f}s ({ratio:5.2f}x) {status}")
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline pipeline benchmarks")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database", default="telegram_bench",
+                        help="scratch database to benchmark against; its raw tables are truncated")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="fractional slowdown against the baseline that counts as a regression")
+    parser.add_argument("--flood-wait-rate", type=float, default=0.0,
+                        help="probability that the fake client raises FloodWaitError on get_entity")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["scraper", "loader", "detector", "api"])
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    # Offline settings; must be in place before src.config is imported
+    os.environ['DB_NAME'] = args.database
+    for key, value in {'DB_HOST': 'localhost', 'DB_PORT': '5432'}.items():
+        os.environ.setdefault(key, value)
+    # Don't push benchmark images to a running detection service
+    os.environ.pop('INFERENCE_SERVICE_URL', None)
+    os.makedirs("logs", exist_ok=True)
+
+    from benchmarks.synthetic import write_dataset
+
+    scale = SCALES[args.scale]
+    channels = [f"bench_channel_{i}" for i in range(scale['channels'])]
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="pipeline-bench-") as workdir:
+        print(f"Generating {args.scale} dataset in {workdir}...")
+        # Keep the image cache out of the real data directory
+        os.environ['IMAGE_CACHE_ROOT'] = os.path.join(workdir, 'media_cache')
+        json_files, image_files = write_dataset(workdir, channels, scale['messages'], scale['images'])
+        image_dir = os.path.join(workdir, 'data', 'raw', 'media')
+
+        if "scraper" not in args.skip:
+            results['scraper'] = bench_scraper(workdir, channels, scale, image_files[0],
+                                               args.flood_wait_rate, args.repeat)
+        if "loader" not in args.skip:
+            results['loader'] = bench_loader(json_files, args.repeat)
+        if "detector" not in args.skip:
+            results['detector'] = bench_detector(image_dir, args.repeat)
+        if "api" not in args.skip:
+            results.update(bench_api(channels[0], args.repeat))
+
+    for name, r in results.items():
+        rate = f", {r['result'] / r['median']:.1f} items/s" if isinstance(r['result'], int) else ""
+        print(f"{name:28s} median {r['median']:.4f}s (min {r['min']:.4f}s){rate}")
+
+    run = {
+        'timestamp': datetime.now().isoformat(),
+        'scale': args.scale,
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    result_path = RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{args.scale}.json"
+    result_path.write_text(json.dumps(run, indent=2))
+    print(f"Results written to {result_path}")
+
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(run, indent=2))
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    if not BASELINE_PATH.exists():
+        print("No baseline found; run with --save-baseline to create one")
+        return 0
+    baseline = json.loads(BASELINE_PATH.read_text())
+    if baseline.get('scale') != args.scale:
+        print(f"Baseline was recorded at scale '{baseline.get('scale')}'; skipping comparison")
+        return 0
+    print(f"Comparing against baseline from {baseline['timestamp']} (threshold {args.threshold:.0%}):")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from PIL import Image, ImageDraw
+
+PRODUCT_WORDS = [
+    'paracetamol', 'aspirin', 'ibuprofen', 'amoxicillin', 'vitamin',
+    'medicine', 'tablet', 'capsule', 'syrup', 'cream', 'lotion', 'serum',
+]
+FILLER_WORDS = [
+    'available', 'now', 'in', 'stock', 'order', 'today', 'delivery', 'addis',
+    'ababa', 'call', 'original', 'quality', 'new', 'arrival', 'pharmacy',
+]
+
+
+def generate_message_text(rng: random.Random) -> str:
+    """Build a product-announcement style message, sometimes with a price."""
+    words = rng.choices(FILLER_WORDS, k=rng.randint(5, 30)) + rng.choices(PRODUCT_WORDS, k=rng.randint(1, 3))
+    rng.shuffle(words)
+    text = ' '.join(words)
+    if rng.random() < 0.6:
+        text += f" Price {rng.randint(50, 5000)} birr"
+    return text
+
+
+def generate_messages(channel_name: str, count: int, start_date: datetime, seed: int = 0,
+                      media_ratio: float = 0.4):
+    """
+    Generate messages in the same shape as TelegramScraper output.
+
+    Args:
+        channel_name (str): Channel the messages belong to.
+        count (int): Number of messages to generate.
+        start_date (datetime): Date of the oldest message; messages are spread over the following days.
+        seed (int): Random seed, so runs at the same scale get identical data.
+        media_ratio (float): Fraction of messages that carry a photo.
+
+    Returns:
+        List[Dict[str, Any]]: Message dictionaries, newest first.
+    """
+    rng = random.Random(f"{channel_name}-{seed}")
+    messages = []
+    for message_id in range(count, 0, -1):
+        date = start_date + timedelta(minutes=message_id * 37)
+        has_media = rng.random() < media_ratio
+        messages.append({
+            'message_id': message_id,
+            'channel_name': channel_name,
+            'message_text': generate_message_text(rng),
+            'message_date': date.isoformat(),
+            'has_media': has_media,
+            'media_type': 'photo' if has_media else None,
+            'scraped_at': datetime.now().isoformat(),
+            'raw_data': {
+                'views': rng.randint(0, 20000),
+                'forwards': rng.randint(0, 500),
+                'replies': rng.randint(0, 50),
+                'grouped_id': None,
+            },
+        })
+    return messages
+
+
+def generate_product_image(path: str, seed: str, size=(1280, 960)):
+    """
+    Draw a product-like image: a few labelled boxes and bottles on a plain background.
+
+    Args:
+        path (str): Where to write the JPEG.
+        seed (str): Random seed for the layout.
+        size (tuple): Image size in pixels.
+    """
+    rng = random.Random(seed)
+    image = Image.new('RGB', size, tuple(rng.randint(200, 255) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(rng.randint(1, 5)):
+        w, h = rng.randint(120, 400), rng.randint(160, 500)
+        x, y = rng.randint(0, size[0] - w), rng.randint(0, size[1] - h)
+        color = tuple(rng.randint(0, 200) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.rectangle([x, y, x + w, y + h], fill=color, outline=(0, 0, 0), width=3)
+        else:
+            draw.rounded_rectangle([x, y, x + w, y + h], radius=w // 4, fill=color)
+        draw.rectangle([x + w // 8, y + h // 3, x + w - w // 8, y + h // 2], fill=(255, 255, 255))
+        draw.text((x + w // 6, y + h // 3 + 5), rng.choice(PRODUCT_WORDS).upper(), fill=(0, 0, 0))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image.save(path, 'JPEG', quality=90)
+
+
+def write_dataset(output_dir: str, channels, messages_per_channel: int, images_per_channel: int,
+                  start_date: datetime = datetime(2024, 1, 1), seed: int = 0):
+    """
+    Write a synthetic raw layer: data/raw/telegram_messages JSON and data/raw/media images.
+
+    Args:
+        output_dir (str): Directory to write the raw layer under.
+        channels (List[str]): Channel names.
+        messages_per_channel (int): Messages to generate per channel.
+        images_per_channel (int): Product images to generate per channel.
+        start_date (datetime): Date of the oldest generated message.
+        seed (int): Random seed.
+
+    Returns:
+        Tuple[List[str], List[str]]: Paths of the JSON files and the images written.
+    """
+    json_files, image_files = [], []
+    date_str = start_date.strftime('%Y-%m-%d')
+    for channel in channels:
+        messages = generate_messages(channel, messages_per_channel, start_date, seed)
+        json_dir = os.path.join(output_dir, 'data', 'raw', 'telegram_messages', date_str)
+        os.makedirs(json_dir, exist_ok=True)
+        json_path = os.path.join(json_dir, f"{channel}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(messages, f, ensure_ascii=False, indent=2)
+        json_files.append(json_path)
+
+        with_media = [m for m in messages if m['has_media']][:images_per_channel]
+        for message in with_media:
+            timestamp = int(datetime.fromisoformat(message['message_date']).timestamp())
+            image_path = os.path.join(output_dir, 'data', 'raw', 'media', channel, date_str,
+                                      f"{message['message_id']}_{timestamp}.jpg")
+            generate_product_image(image_path, seed=f"{channel}-{message['message_id']}-{seed}")
+            image_files.append(image_path)
+    return json_files, image_files
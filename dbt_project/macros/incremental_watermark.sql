@@ -0,0 +1,6 @@
+{% macro incremental_watermark(column) %}
+    {#- Highest value of `column` already present in the incremental model being built, minus a
+        lookback covering load transactions that were still open when the last build ran -#}
+    (SELECT COALESCE(MAX({{ column }}), '1900-01-01'::timestamp)
+        - INTERVAL '{{ var("incremental_lookback", "1 hour") }}' FROM {{ this }})
+{% endmacro %}
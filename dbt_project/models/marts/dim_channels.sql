@@ -1,12 +1,28 @@
-{{ config(materialized='table', schema = 'mart') }}
+{{ config(
+    materialized='incremental',
+    unique_key='channel_id',
+    incremental_strategy='delete+insert',
+    schema = 'mart'
+) }}
 
+-- channel_id is a hash of channel_name so it stays stable across rebuilds.
+-- Incremental runs only re-aggregate channels that received new messages.
 SELECT 
-    ROW_NUMBER() OVER (ORDER BY channel_name) as channel_id,
+    {{ dbt_utils.generate_surrogate_key(['channel_name']) }} as channel_id,
     channel_name,
     COUNT(*) as total_messages,
     MIN(message_date) as first_message_date,
     MAX(message_date) as last_message_date,
     COUNT(CASE WHEN has_media THEN 1 END) as messages_with_media,
-    ROUND(AVG(message_length), 2) as avg_message_length
+    ROUND(AVG(message_length), 2) as avg_message_length,
+    MAX(scraped_at) as last_scraped_at,
+    MAX(loaded_at) as last_loaded_at
 FROM {{ ref('stg_telegram_messages') }}
-GROUP BY channel_name
\ No newline at end of file
+{% if is_incremental() %}
+WHERE channel_name IN (
+    SELECT DISTINCT channel_name
+    FROM {{ ref('stg_telegram_messages') }}
+    WHERE loaded_at > {{ incremental_watermark('last_loaded_at') }}
+)
+{% endif %}
+GROUP BY channel_name
@@ -1,9 +1,20 @@
-{{ config(materialized='table', schema = 'mart') }}
+{{ config(
+    materialized='incremental',
+    unique_key='date_day',
+    incremental_strategy='delete+insert',
+    schema = 'mart'
+) }}
 
 WITH date_spine AS (
-    SELECT DISTINCT DATE(message_date) as date_day
+    SELECT 
+        DATE(message_date) as date_day,
+        MAX(loaded_at) as last_loaded_at
     FROM {{ ref('stg_telegram_messages') }}
     WHERE message_date IS NOT NULL
+    {% if is_incremental() %}
+        AND loaded_at > {{ incremental_watermark('last_loaded_at') }}
+    {% endif %}
+    GROUP BY DATE(message_date)
 )
 
 SELECT 
@@ -15,5 +26,6 @@ SELECT
     TO_CHAR(date_day, 'Day') as day_name,
     TO_CHAR(date_day, 'Month') as month_name,
     EXTRACT(QUARTER FROM date_day) as quarter,
-    CASE WHEN EXTRACT(DOW FROM date_day) IN (0, 6) THEN true ELSE false END as is_weekend
-FROM date_spine
\ No newline at end of file
+    CASE WHEN EXTRACT(DOW FROM date_day) IN (0, 6) THEN true ELSE false END as is_weekend,
+    last_loaded_at
+FROM date_spine
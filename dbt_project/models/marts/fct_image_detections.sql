@@ -1,13 +1,38 @@
-{{ config(materialized='table', schema = 'mart') }}
+{{ config(
+    materialized='incremental',
+    unique_key='detection_id',
+    incremental_strategy='delete+insert',
+    schema = 'mart'
+) }}
+
+WITH messages AS (
+    SELECT DISTINCT ON (channel_name, message_id)
+        channel_name,
+        message_id,
+        message_date
+    FROM {{ ref('stg_telegram_messages') }}
+    ORDER BY channel_name, message_id, scraped_at DESC
+)
 
 SELECT 
     d.detection_id,
     d.message_id,
-    c.channel_id,
+    CASE WHEN m.channel_name IS NOT NULL
+        THEN {{ dbt_utils.generate_surrogate_key(['m.channel_name', 'm.message_id']) }}
+    END as message_key,
+    CASE WHEN m.channel_name IS NOT NULL
+        THEN {{ dbt_utils.generate_surrogate_key(['m.channel_name']) }}
+    END as channel_id,
     DATE(m.message_date) as date_day,
     d.detected_class,
     d.confidence_score,
     d.created_at
 FROM {{ ref('stg_image_detections') }} d
-LEFT JOIN {{ ref('stg_telegram_messages') }} m ON d.message_id = m.message_id
-LEFT JOIN {{ ref('dim_channels') }} c ON m.channel_name = c.channel_name
\ No newline at end of file
+LEFT JOIN messages m
+    ON d.channel_name = m.channel_name
+    AND d.message_id = m.message_id
+{% if is_incremental() %}
+-- Detections are often stored before their message is loaded; revisit those until it arrives
+WHERE d.created_at > {{ incremental_watermark('created_at') }}
+    OR d.detection_id IN (SELECT detection_id FROM {{ this }} WHERE channel_id IS NULL)
+{% endif %}
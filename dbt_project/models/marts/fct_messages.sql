@@ -1,8 +1,43 @@
-{{ config(materialized='table', schema = 'mart') }}
+{{ config(
+    materialized='incremental',
+    unique_key='message_key',
+    incremental_strategy='delete+insert',
+    schema = 'mart'
+) }}
+
+-- Telegram numbers messages per channel, so a message is identified by
+-- (channel_name, message_id); message_key hashes the pair.
+-- Incremental runs pick up newly loaded messages plus messages that received
+-- new detections since the last run, so detection_count stays current.
+WITH detections AS (
+    SELECT 
+        channel_name,
+        message_id,
+        COUNT(*) as detection_count,
+        MAX(created_at) as last_detected_at
+    FROM {{ ref('stg_image_detections') }}
+    GROUP BY channel_name, message_id
+),
+
+messages AS (
+    -- A message can be loaded more than once when it is re-scraped; keep the latest copy
+    SELECT DISTINCT ON (channel_name, message_id) *
+    FROM {{ ref('stg_telegram_messages') }}
+    {% if is_incremental() %}
+    WHERE loaded_at > {{ incremental_watermark('loaded_at') }}
+        OR (channel_name, message_id) IN (
+            SELECT channel_name, message_id
+            FROM {{ ref('stg_image_detections') }}
+            WHERE created_at > {{ incremental_watermark('last_detected_at') }}
+        )
+    {% endif %}
+    ORDER BY channel_name, message_id, scraped_at DESC, loaded_at DESC
+)
 
 SELECT 
+    {{ dbt_utils.generate_surrogate_key(['m.channel_name', 'm.message_id']) }} as message_key,
     m.message_id,
-    c.channel_id,
+    {{ dbt_utils.generate_surrogate_key(['m.channel_name']) }} as channel_id,
     DATE(m.message_date) as date_day,
     m.message_text,
     m.message_length,
@@ -10,13 +45,10 @@ SELECT
     m.media_type,
     m.mentions_price,
     COALESCE(d.detection_count, 0) as detection_count,
-    m.scraped_at
-FROM {{ ref('stg_telegram_messages') }} m
-LEFT JOIN {{ ref('dim_channels') }} c ON m.channel_name = c.channel_name
-LEFT JOIN (
-    SELECT 
-        message_id,
-        COUNT(*) as detection_count
-    FROM {{ ref('stg_image_detections') }}
-    GROUP BY message_id
-) d ON m.message_id = d.message_id
\ No newline at end of file
+    d.last_detected_at,
+    m.scraped_at,
+    m.loaded_at
+FROM messages m
+LEFT JOIN detections d
+    ON m.channel_name = d.channel_name
+    AND m.message_id = d.message_id
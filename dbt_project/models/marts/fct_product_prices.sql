@@ -0,0 +1,27 @@
+{{ config(
+    materialized='incremental',
+    unique_key=['channel_name', 'message_id'],
+    incremental_strategy='delete+insert',
+    schema = 'mart',
+    indexes=[
+        {'columns': ['product', 'date_day']},
+        {'columns': ['channel_id', 'date_day']}
+    ]
+) }}
+
+-- A message's prices are always re-extracted together, so replacing them per message
+-- also drops matches a re-extraction no longer finds.
+SELECT 
+    p.price_id,
+    p.message_id,
+    {{ dbt_utils.generate_surrogate_key(['p.channel_name']) }} as channel_id,
+    p.channel_name,
+    DATE(p.message_date) as date_day,
+    p.product,
+    p.amount,
+    p.currency,
+    p.extracted_at
+FROM {{ ref('stg_message_prices') }} p
+{% if is_incremental() %}
+WHERE p.extracted_at > {{ incremental_watermark('extracted_at') }}
+{% endif %}
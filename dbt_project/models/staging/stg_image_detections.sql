@@ -3,10 +3,13 @@
 SELECT 
     id as detection_id,
     message_id,
+    -- Message ids are only unique within a channel; the channel is the media directory
+    -- two levels above the file (<channel>/<date>/<file>)
+    SUBSTRING(image_path FROM '([^/\\]+)[/\\][^/\\]+[/\\][^/\\]+$') as channel_name,
     image_path,
     detected_class,
     confidence_score,
     bbox_coordinates,
     created_at
 FROM {{ source('raw', 'image_detections') }}
-WHERE confidence_score >= 0.5
\ No newline at end of file
+WHERE confidence_score >= 0.5
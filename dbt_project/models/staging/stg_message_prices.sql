@@ -0,0 +1,16 @@
+{{ config(materialized='view') }}
+
+SELECT 
+    -- Keyed on the natural key: reloading a partition or replaying the archive
+    -- re-inserts prices under new SERIAL ids
+    {{ dbt_utils.generate_surrogate_key(['channel_name', 'message_id', 'match_index']) }} as price_id,
+    message_id,
+    channel_name,
+    message_date::timestamp as message_date,
+    match_index,
+    amount,
+    UPPER(currency) as currency,
+    LOWER(product) as product,
+    extracted_at
+FROM {{ source('raw', 'message_prices') }}
+WHERE amount > 0
@@ -8,6 +8,7 @@ SELECT
     has_media,
     media_type,
     scraped_at::timestamp as scraped_at,
+    loaded_at,
     LENGTH(TRIM(message_text)) as message_length,
     CASE 
         WHEN message_text ILIKE '%price%' OR message_text ILIKE '%cost%' OR message_text ILIKE '%birr%' THEN true
@@ -13,5 +13,9 @@ CREATE TABLE IF NOT EXISTS raw.telegram_messages (
     has_media BOOLEAN,
     media_type VARCHAR(50),
     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    raw_data JSONB
-);
\ No newline at end of file
+    raw_data JSONB,
+    loaded_at TIMESTAMP DEFAULT now()
+);
+
+-- Watermark index for incremental dbt models
+CREATE INDEX IF NOT EXISTS idx_telegram_messages_loaded_at ON raw.telegram_messages (loaded_at);
@@ -1,127 +1,269 @@
 #!/usr/bin/env python3
 """
 Main pipeline runner script
+
+    python run_pipeline.py [--profile [DIR]] {scrape,load,archive,transform,enrich,all} [options]
+
+Each stage imports its heavy dependencies (Telethon, dbt, ultralytics/torch) only
+when it runs, and validates only the configuration it needs.
 """
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import argparse
 import asyncio
-import subprocess
-import sys
-from pathlib import Path
-from src.scraping.telegram_scraper import TelegramScraper
-from src.scraping.data_loader import DataLoader
-from src.enrichment.yolo_detector import YOLODetector
-from src.config import TELEGRAM_CHANNELS
-
-async def run_scraping():
-    """Run the scraping phase"""
+import importlib
+import logging
+from src import config
+from src.telemetry import PipelineRun
+
+logger = logging.getLogger(__name__)
+
+# Modules each subcommand needs; imported in a timed startup stage before it runs
+STAGE_MODULES = {
+    'scrape': ['src.scraping.telegram_scraper'],
+    'load': ['src.scraping.data_loader'],
+    'archive': ['src.scraping.archive'],
+    'transform': ['src.transformation.dbt_runner'],
+    'enrich': ['src.enrichment.yolo_detector'],
+}
+
+def startup_modules(args):
+    """Return the modules the stages this invocation will actually run need."""
+    if args.command != 'all':
+        return STAGE_MODULES[args.command]
+    stages = ['scrape', 'load', 'transform', 'enrich']
+    # Streaming always scrapes; otherwise --skip-scrape starts from the existing raw data
+    if args.skip_scrape and not args.streaming:
+        stages.remove('scrape')
+    return [module for stage in stages for module in STAGE_MODULES[stage]]
+
+async def run_scraping(channels=None, limit=100):
+    """Run the scraping phase. Returns the number of messages scraped."""
+    from src.scraping.telegram_scraper import TelegramScraper
+
     print("Starting Telegram data scraping...")
     scraper = TelegramScraper()
+    total = 0
     
-    for channel in TELEGRAM_CHANNELS:
+    for channel in channels or config.TELEGRAM_CHANNELS:
         print(f"Scraping channel: {channel}")
-        messages = await scraper.scrape_channel(channel, limit=100)
+        messages = await scraper.scrape_channel(channel, limit=limit)
         scraper.save_to_json(messages, channel)
+        total += len(messages)
     
     await scraper.client.disconnect()
     print("Scraping completed!")
+    return total
+
+def run_loading(replay=False, truncate=False):
+    """Run the data loading phase, from JSON or by replaying the Parquet archive. Returns the number of records loaded."""
+    from src.scraping.data_loader import DataLoader
 
-def run_loading():
-    """Run the data loading phase"""
     print("Loading data to PostgreSQL...")
     loader = DataLoader()
-    loader.load_all_json_files()
+    total = loader.replay_archive(truncate=truncate) if replay else loader.load_all_json_files()
     print("Data loading completed!")
+    return total
 
-def run_dbt():
-    """Run dbt transformations for the project."""
-    import os
-    from dotenv import load_dotenv
-
-    # Load environment variables from .env
-    load_dotenv()
-
-    # Use a relative path for portability
-    dbt_dir = Path(os.path.join(os.getcwd(), "dbt_project"))
-    print(f"dbt directory: {dbt_dir}")
-
-    # Check if directory exists
-    if not Path(dbt_dir).exists():
-        print(f"dbt directory does not exist: {dbt_dir}")
-        return
+def run_dbt(select=None, full_refresh=False, changed=False):
+    """Run dbt transformations in-process, optionally limited to the given selectors or changed sources."""
+    from src.transformation.dbt_runner import get_dbt_runner
 
+    print("Running dbt transformations...")
     try:
-        # Run dbt debug to check connection before running transformations
-        debug_result = subprocess.run(
-            "dbt debug",
-            cwd=dbt_dir,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        print(debug_result.stdout)
-        if debug_result.returncode != 0:
-            print("dbt debug failed:")
-            print(debug_result.stdout)
-            print(debug_result.stderr)
-            return
-        # Run dbt run
-        result = subprocess.run(
-            "dbt run",
-            shell=True,
-            cwd=dbt_dir,
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        print(result.stdout)
-        if result.returncode != 0:
-            print(f"dbt run failed:\n{result.stderr}")
-            return
-
-        # Run dbt test
-        result = subprocess.run(
-            "dbt test",
-            shell=True, 
-            cwd=dbt_dir,
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        print(result.stdout)
-        if result.returncode != 0:
-            print(f"dbt test failed:\n{result.stderr}")
-
-        print("dbt transformations completed!")
-    except subprocess.TimeoutExpired:
-        print("dbt execution timed out")
+        runner = get_dbt_runner()
+        results = runner.build_changed() if changed else runner.build(select=select, full_refresh=full_refresh)
     except Exception as e:
-        print(f"dbt failed: {e}")
+        logger.error(f"dbt failed: {e}")
+        raise
+
+    for r in results:
+        print(f"  {r['unique_id']}: {r['status']} ({r['execution_time']:.2f}s)")
+    failed = [r['unique_id'] for r in results if r['status'] in ('error', 'fail')]
+    if failed:
+        # Fail the stage so the run exits non-zero and telemetry records it as failed
+        logger.error(f"dbt finished with {len(failed)} failed node(s): {', '.join(failed)}")
+        raise RuntimeError(f"dbt build failed for {len(failed)} node(s)")
+    print("dbt transformations completed!")
+    return results
+
+def run_enrichment(image_dir=None):
+    """Run YOLO enrichment. Returns the number of images found."""
+    from src.enrichment.yolo_detector import YOLODetector
 
-def run_enrichment():
-    """Run YOLO enrichment"""
     print("Running YOLO enrichment...")
     detector = YOLODetector()
     detector.create_detections_table()
-    detector.process_all_images()
+    total = detector.process_images(image_dir) if image_dir else detector.process_all_images()
     print("YOLO enrichment completed!")
+    return total
+
+async def _load_worker(loader, load_queue):
+    """Load each channel's JSON file as soon as the scraper has written it."""
+    while (json_path := await load_queue.get()) is not None:
+        await asyncio.to_thread(loader.load_json_to_postgres, json_path)
+
+async def _enrich_worker(detector, media_queue):
+    """Run detection on each image as soon as the scraper has downloaded it."""
+    seen = set()
+    while (image_path := await media_queue.get()) is not None:
+        # Scrape retries can re-emit the same file
+        if image_path in seen:
+            continue
+        seen.add(image_path)
+        if image_path.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.tiff')):
+            await asyncio.to_thread(detector.process_single_image, image_path)
+
+async def run_streaming(run):
+    """
+    Run scraping, loading and enrichment concurrently, connected by bounded queues.
+    Loading and detection start as soon as each channel or image is available, and a
+    full queue blocks the scraper until the slower stage catches up. dbt runs once
+    all three have drained.
+    """
+    print("Starting streaming pipeline...")
+    # Stages overlap in this mode, so scrape/load/enrich are measured as one stage
+    with run.stage("streaming") as stage:
+        stage.items = await _run_streaming_stages()
+
+    with run.stage("transformation") as stage:
+        stage.items = len(run_dbt())
+    print("Pipeline completed successfully!")
+
+async def _run_streaming_stages():
+    """Run the overlapped stages and return the number of messages scraped."""
+    from src.scraping.telegram_scraper import TelegramScraper
+    from src.scraping.data_loader import DataLoader
+    from src.enrichment.yolo_detector import YOLODetector
 
-async def main():
+    # Set up the consumers first so a startup failure can't leave the scraper blocked on a full queue
+    loader = DataLoader()
+    detector = YOLODetector()
+    detector.create_detections_table()
+
+    load_queue = asyncio.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+    media_queue = asyncio.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+    workers = [
+        asyncio.create_task(_load_worker(loader, load_queue)),
+        asyncio.create_task(_enrich_worker(detector, media_queue)),
+    ]
+
+    scraper = TelegramScraper()
+    total = 0
+    try:
+        for channel in config.TELEGRAM_CHANNELS:
+            print(f"Scraping channel: {channel}")
+            messages = await scraper.scrape_channel(channel, limit=100, media_queue=media_queue)
+            total += len(messages)
+            json_path = scraper.save_to_json(messages, channel)
+            if json_path:
+                await load_queue.put(json_path)
+    finally:
+        await scraper.client.disconnect()
+        await load_queue.put(None)
+        await media_queue.put(None)
+        await asyncio.gather(*workers)
+    print("Scraping, loading and enrichment completed!")
+    return total
+
+async def run_all(run, skip_scrape=False):
     """Run the complete pipeline"""
+    from src.transformation.dbt_runner import SOURCE_SELECTORS
+
     print("Starting Telegram Data Pipeline...")
     
     # Phase 1: Scraping
-    # await run_scraping()
+    if not skip_scrape:
+        with run.stage("scraping") as stage:
+            stage.items = await run_scraping()
     
     # Phase 2: Loading
-    run_loading()
+    with run.stage("loading") as stage:
+        stage.items = run_loading()
     
     # Phase 3: Transformation
-    run_dbt()
+    with run.stage("transformation") as stage:
+        stage.items = len(run_dbt(select=[SOURCE_SELECTORS['messages'], SOURCE_SELECTORS['prices']]))
     
-    # Phase 4: Enrichment
-    run_enrichment()
+    # Phase 4: Enrichment, then rebuild only the detection branch
+    with run.stage("enrichment") as stage:
+        stage.items = run_enrichment()
+    with run.stage("transformation_detections") as stage:
+        stage.items = len(run_dbt(select=[SOURCE_SELECTORS['detections']]))
     
     print("Pipeline completed successfully!")
 
+async def main(args, run):
+    """Import the subcommand's dependencies in a timed startup stage, then run it."""
+    modules = startup_modules(args)
+    with run.stage(f"startup_{args.command}") as stage:
+        for module in modules:
+            importlib.import_module(module)
+        stage.items = len(modules)
+    print(f"Startup for '{args.command}': {time.perf_counter() - _PROCESS_START:.2f}s")
+
+    if args.command == "scrape":
+        with run.stage("scraping") as stage:
+            stage.items = await run_scraping(channels=args.channels, limit=args.limit)
+    elif args.command == "load":
+        with run.stage("loading") as stage:
+            stage.items = run_loading(replay=args.replay, truncate=args.truncate)
+    elif args.command == "archive":
+        from src.scraping.archive import convert_json_to_archive
+        with run.stage("archiving") as stage:
+            stage.items = convert_json_to_archive()
+    elif args.command == "transform":
+        with run.stage("transformation") as stage:
+            stage.items = len(run_dbt(select=args.select, full_refresh=args.full_refresh, changed=args.changed))
+    elif args.command == "enrich":
+        with run.stage("enrichment") as stage:
+            stage.items = run_enrichment(image_dir=args.image_dir)
+    elif args.streaming:
+        await run_streaming(run)
+    else:
+        await run_all(run, skip_scrape=args.skip_scrape)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the Telegram data pipeline")
+    parser.add_argument("--profile", nargs="?", const="logs/profiles", metavar="DIR",
+                        help="write a cProfile dump per stage to DIR (default: logs/profiles)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrape = subparsers.add_parser("scrape", help="scrape Telegram channels to data/raw")
+    scrape.add_argument("--channels", nargs="+", help="channels to scrape (default: TELEGRAM_CHANNELS)")
+    scrape.add_argument("--limit", type=int, default=100, help="messages per channel")
+
+    load = subparsers.add_parser("load", help="load raw JSON files into PostgreSQL")
+    load.add_argument("--replay", action="store_true", help="COPY from the Parquet archive instead of the JSON files, replacing the replayed channel/days")
+    load.add_argument("--truncate", action="store_true", help="with --replay, empty raw.telegram_messages first")
+
+    subparsers.add_parser("archive", help="convert raw JSON files to the Parquet archive")
+
+    transform = subparsers.add_parser("transform", help="build and test the dbt models")
+    transform.add_argument("--select", nargs="+", help="dbt selectors to build")
+    transform.add_argument("--full-refresh", action="store_true", help="rebuild incremental models")
+    transform.add_argument("--changed", action="store_true",
+                           help="build only models downstream of sources with new data")
+
+    enrich = subparsers.add_parser("enrich", help="run YOLO detection on downloaded images")
+    enrich.add_argument("--image-dir", help="only process images under this directory")
+
+    run_all_parser = subparsers.add_parser("all", help="run every stage")
+    run_all_parser.add_argument("--skip-scrape", action="store_true", help="start from the existing raw data")
+    run_all_parser.add_argument("--streaming", action="store_true",
+                                help="overlap scraping, loading and enrichment instead of running them one after another")
+    return parser
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.command == "load" and args.truncate and not args.replay:
+        parser.error("--truncate only applies with --replay")
+
+    run = PipelineRun(profile_dir=args.profile)
+    try:
+        asyncio.run(main(args, run))
+    finally:
+        run.finish()
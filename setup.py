@@ -21,7 +21,10 @@ setup(
         "dagster-webserver>=1.5.1",
         "dagster-postgres>=0.21.1",
         "requests>=2.31.0",
+        "httpx>=0.25.0",
+        "psutil>=5.9.5",
         "pandas>=2.1.1",
+        "pyarrow>=13.0.0",
         "numpy>=1.25.2"
     ],
     python_requires=">=3.13",
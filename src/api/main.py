@@ -1,8 +1,10 @@
 from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from src.database import get_db
-from src.api.schemas import TopProductsResponse, ChannelActivityResponse, MessageSearchResponse
+from src.database import get_db, get_engine
+from src.api.metrics import metrics_middleware, instrument_engine, render_metrics
+from src.api.schemas import TopProductsResponse, ChannelActivityResponse, MessageSearchResponse, ProductPriceStatsResponse
 from typing import List, Optional
 import logging
 
@@ -15,10 +17,18 @@ app = FastAPI(
     version="1.0.0"
 )
 
+app.middleware("http")(metrics_middleware)
+instrument_engine(get_engine())
+
 @app.get("/")
 async def root():
     return {"message": "Telegram Analytics API", "version": "1.0.0"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Expose request and query metrics in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/reports/top-products", response_model=List[TopProductsResponse])
 async def get_top_products(
     limit: int = Query(10, ge=1, le=100),
@@ -59,6 +69,58 @@ async def get_top_products(
         logger.error(f"Error getting top products: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/api/reports/product-prices", response_model=List[ProductPriceStatsResponse])
+async def get_product_prices(
+    product: Optional[str] = Query(None, min_length=2),
+    channel: Optional[str] = Query(None),
+    days: int = Query(30, ge=1, le=3650),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Get price statistics per product and channel over the last `days` days"""
+    try:
+        query = text("""
+            SELECT
+                p.product as product_name,
+                p.channel_name,
+                p.currency,
+                COUNT(*) as price_count,
+                MIN(p.amount) as min_price,
+                MAX(p.amount) as max_price,
+                AVG(p.amount) as avg_price,
+                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY p.amount) as median_price,
+                MIN(p.date_day) as first_seen,
+                MAX(p.date_day) as last_seen
+            FROM public_mart.fct_product_prices p
+            WHERE p.product IS NOT NULL
+                AND p.date_day >= CURRENT_DATE - :days
+                AND (CAST(:product AS TEXT) IS NULL OR p.product = LOWER(:product))
+                AND (CAST(:channel AS TEXT) IS NULL OR LOWER(p.channel_name) = LOWER(:channel))
+            GROUP BY p.product, p.channel_name, p.currency
+            ORDER BY price_count DESC
+            LIMIT :limit
+        """)
+
+        result = db.execute(query, {"product": product, "channel": channel, "days": days, "limit": limit})
+        return [
+            ProductPriceStatsResponse(
+                product_name=row.product_name,
+                channel_name=row.channel_name,
+                currency=row.currency,
+                price_count=row.price_count,
+                min_price=row.min_price,
+                max_price=row.max_price,
+                avg_price=row.avg_price,
+                median_price=row.median_price,
+                first_seen=row.first_seen,
+                last_seen=row.last_seen
+            )
+            for row in result
+        ]
+    except Exception as e:
+        logger.error(f"Error getting product prices: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/api/channels/{channel_name}/activity", response_model=ChannelActivityResponse)
 async def get_channel_activity(
     channel_name: str,
@@ -163,12 +225,12 @@ async def get_overview_stats(db: Session = Depends(get_db)):
         query = text("""
             SELECT 
                 COUNT(DISTINCT c.channel_name) as total_channels,
-                COUNT(m.message_id) as total_messages,
-                COUNT(CASE WHEN m.has_media THEN 1 END) as messages_with_media,
+                COUNT(DISTINCT m.message_key) as total_messages,
+                COUNT(DISTINCT CASE WHEN m.has_media THEN m.message_key END) as messages_with_media,
                 COUNT(DISTINCT d.detection_id) as total_detections
             FROM public_mart.fct_messages m
             JOIN public_mart.dim_channels c ON m.channel_id = c.channel_id
-            LEFT JOIN public_mart.fct_image_detections d ON m.message_id = d.message_id
+            LEFT JOIN public_mart.fct_image_detections d ON m.message_key = d.message_key
         """)
         
         result = db.execute(query).first()
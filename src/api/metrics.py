@@ -0,0 +1,244 @@
+import time
+import queue
+import logging
+import threading
+from collections import defaultdict
+from sqlalchemy import event
+from src.config import SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAIN_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets in seconds, matching the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Minimal labelled histogram rendered in the Prometheus text exposition format.
+    """
+    def __init__(self, name, description, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: [0] * len(buckets))
+        self._sums = defaultdict(float)
+        self._totals = defaultdict(int)
+
+    def observe(self, labels, value):
+        """Record a single observation for the given label values."""
+        with self._lock:
+            counts = self._counts[labels]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._sums[labels] += value
+            self._totals[labels] += 1
+
+    def render(self):
+        """Render the histogram as Prometheus exposition lines."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for labels, counts in self._counts.items():
+                base = _format_labels(self.label_names, labels)
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {self._totals[labels]}')
+                lines.append(f"{self.name}_sum{{{base}}} {self._sums[labels]}")
+                lines.append(f"{self.name}_count{{{base}}} {self._totals[labels]}")
+        return lines
+
+
+class Counter:
+    """
+    Minimal labelled counter rendered in the Prometheus text exposition format.
+    """
+    def __init__(self, name, description, label_names):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        self._values = defaultdict(float)
+
+    def inc(self, labels, amount=1):
+        """Increment the counter for the given label values."""
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self):
+        """Render the counter as Prometheus exposition lines."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+
+def _format_labels(names, values):
+    """Format label names and values as a Prometheus label set body."""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ') for v in values)
+    return ",".join(f'{n}="{v}"' for n, v in zip(names, escaped))
+
+
+def _statement_label(statement):
+    """Collapse a SQL statement to a single-line label of bounded length."""
+    return " ".join(statement.split())[:200]
+
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+REQUEST_ERRORS = Counter(
+    "api_request_errors_total",
+    "Requests that ended in a server error, by route",
+    ("method", "route"),
+)
+QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ("statement",),
+)
+QUERY_ROWS = Counter(
+    "db_query_rows_total",
+    "Rows returned or affected by SQL statements",
+    ("statement",),
+)
+SLOW_QUERIES = Counter(
+    "db_slow_queries_total",
+    "SQL statements exceeding the slow-query threshold",
+    ("statement",),
+)
+
+
+async def metrics_middleware(request, call_next):
+    """Record per-route latency for every HTTP request."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = _route_template(request)
+        if status >= 500:
+            REQUEST_ERRORS.inc((request.method, route))
+        REQUEST_LATENCY.observe((request.method, route, str(status)), time.perf_counter() - start)
+
+
+def _route_template(request):
+    """Return the matched route template so path parameters don't explode label cardinality."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class PlanCapturer:
+    """
+    Captures EXPLAIN (ANALYZE, BUFFERS) for slow SELECTs on a background thread. ANALYZE runs
+    the query again, so this stays off the request path, uses one pooled connection at a time,
+    drops submissions when its queue is full and samples each statement at most once per
+    `interval` seconds.
+    """
+    def __init__(self, engine, interval=SLOW_QUERY_EXPLAIN_INTERVAL, queue_size=8):
+        self.engine = engine
+        self.interval = interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._last_captured = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, label, statement, parameters):
+        """Queue a plan capture unless the statement was sampled recently or the queue is full."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_captured.get(label, float('-inf')) < self.interval:
+                return
+            self._last_captured[label] = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((label, statement, parameters))
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            label, statement, parameters = self._queue.get()
+            plan = self._explain(statement, parameters)
+            if plan:
+                logger.warning(f"Plan for slow query {label}:\n{plan}")
+
+    def _explain(self, statement, parameters):
+        try:
+            # Use the raw DBAPI cursor so the EXPLAIN itself isn't timed or logged
+            with self.engine.connect() as conn:
+                try:
+                    cursor = conn.connection.cursor()
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                    return "\n".join(row[0] for row in cursor.fetchall())
+                finally:
+                    conn.rollback()
+        except Exception as e:
+            logger.warning(f"Could not capture plan for slow query: {e}")
+            return None
+
+
+def instrument_engine(engine, threshold_ms=SLOW_QUERY_THRESHOLD_MS, explain=SLOW_QUERY_EXPLAIN):
+    """
+    Attach query timing, row counting and slow-query logging to a SQLAlchemy engine.
+
+    Args:
+        engine: The SQLAlchemy engine to instrument.
+        threshold_ms (float): Statements slower than this are logged as slow.
+        explain (bool): Capture EXPLAIN (ANALYZE, BUFFERS) for slow SELECT statements in the background.
+    """
+    if engine.info.get('instrumented'):
+        return
+    engine.info['instrumented'] = True
+    plan_capturer = PlanCapturer(engine) if explain else None
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        label = (_statement_label(statement),)
+        QUERY_LATENCY.observe(label, elapsed)
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            QUERY_ROWS.inc(label, cursor.rowcount)
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < threshold_ms:
+            return
+        SLOW_QUERIES.inc(label)
+        message = f"Slow query ({elapsed_ms:.1f} ms, {cursor.rowcount} rows): {label[0]}"
+        is_select = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        logger.warning(message)
+        if plan_capturer and is_select and not executemany:
+            plan_capturer.submit(label[0], statement, parameters)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # after_cursor_execute doesn't fire for a failed statement; drop its start time
+        conn = exception_context.connection
+        if exception_context.cursor is not None and conn is not None and conn.info.get('query_start'):
+            conn.info['query_start'].pop()
+
+
+def render_metrics():
+    """Render all registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in (REQUEST_LATENCY, REQUEST_ERRORS, QUERY_LATENCY, QUERY_ROWS, SLOW_QUERIES):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
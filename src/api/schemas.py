@@ -30,4 +30,16 @@ class DetectionResponse(BaseModel):
     channel_name: str
     detected_class: str
     confidence_score: float
-    date_day: date
\ No newline at end of file
+    date_day: date
+
+class ProductPriceStatsResponse(BaseModel):
+    product_name: str
+    channel_name: str
+    currency: str
+    price_count: int
+    min_price: float
+    max_price: float
+    avg_price: float
+    median_price: float
+    first_seen: Optional[date]
+    last_seen: Optional[date]
@@ -1,31 +1,85 @@
 import os
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Telegram API configuration
-TELEGRAM_API_ID = int(os.getenv('TELEGRAM_API_ID'))
-TELEGRAM_API_HASH = os.getenv('TELEGRAM_API_HASH')
-TELEGRAM_PHONE = os.getenv('TELEGRAM_PHONE')
+# First day of the channel/day partitions used by the Dagster assets
+PARTITION_START_DATE = os.getenv('PARTITION_START_DATE', '2022-09-01')
+
+# Capacity of the queues between stages in streaming pipeline mode
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 32))
+
+# Directory for per-stage cProfile dumps from Dagster runs; profiling is off when unset
+PIPELINE_PROFILE_DIR = os.getenv('PIPELINE_PROFILE_DIR')
+
+# Detection service; when INFERENCE_SERVICE_URL is set the scraper pushes new images to it
+INFERENCE_SERVICE_URL = os.getenv('INFERENCE_SERVICE_URL')
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv('INFERENCE_MAX_BATCH_SIZE', 16))
+INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', 50))
+INFERENCE_QUEUE_SIZE = int(os.getenv('INFERENCE_QUEUE_SIZE', 1024))
 
-# Database configuration
-DB_HOST = os.getenv('DB_HOST')
-DB_PORT = int(os.getenv('DB_PORT'))
-DB_NAME = os.getenv('DB_NAME')
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
+# Letterboxed copies of downloaded images at the detector's input size
+IMAGE_CACHE_ENABLED = os.getenv('IMAGE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+IMAGE_CACHE_ROOT = os.getenv('IMAGE_CACHE_ROOT', 'data/processed/media_cache')
+IMAGE_CACHE_SIZE = int(os.getenv('IMAGE_CACHE_SIZE', 640))
+
+# Resolved channel entities (id, access_hash), so scraping skips username resolution
+ENTITY_CACHE_PATH = os.getenv('ENTITY_CACHE_PATH', 'data/cache/telegram_entities.json')
+ENTITY_CACHE_TTL_DAYS = float(os.getenv('ENTITY_CACHE_TTL_DAYS', 30))
 
 # API configuration
 API_HOST = os.getenv('API_HOST', '0.0.0.0')
 API_PORT = int(os.getenv('API_PORT', 8000))
 
-# Database URL
-from urllib.parse import quote_plus
-DATABASE_URL = f"postgresql://{DB_USER}:{quote_plus(str(DB_PASSWORD))}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Query instrumentation
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 500))
+SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'false').lower() in ('1', 'true', 'yes')
+# Capture at most one plan per statement in this many seconds
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 300))
 
 # Telegram channels to scrape
 TELEGRAM_CHANNELS = [
     'CheMed123',
     'lobelia4cosmetics',
     'tikvahpharma'
-]
\ No newline at end of file
+]
+
+
+def _require(name, cast=str):
+    """Read a required environment variable, failing with a clear message if it is unset."""
+    value = os.getenv(name)
+    if value is None or value == '':
+        raise RuntimeError(f"Missing required environment variable: {name}")
+    return cast(value)
+
+
+def _database_url():
+    password = quote_plus(os.getenv('DB_PASSWORD', ''))
+    return (f"postgresql://{_require('DB_USER')}:{password}@{_require('DB_HOST')}:"
+            f"{_require('DB_PORT', int)}/{_require('DB_NAME')}")
+
+
+# Settings that only some stages need are resolved on first access, so e.g. a
+# loading run doesn't require Telegram credentials.
+_LAZY_SETTINGS = {
+    # Telegram API configuration
+    'TELEGRAM_API_ID': lambda: _require('TELEGRAM_API_ID', int),
+    'TELEGRAM_API_HASH': lambda: _require('TELEGRAM_API_HASH'),
+    'TELEGRAM_PHONE': lambda: os.getenv('TELEGRAM_PHONE'),
+    # Database configuration
+    'DB_HOST': lambda: _require('DB_HOST'),
+    'DB_PORT': lambda: _require('DB_PORT', int),
+    'DB_NAME': lambda: _require('DB_NAME'),
+    'DB_USER': lambda: _require('DB_USER'),
+    'DB_PASSWORD': lambda: os.getenv('DB_PASSWORD'),
+    'DATABASE_URL': _database_url,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_SETTINGS:
+        value = _LAZY_SETTINGS[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
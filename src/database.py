@@ -1,18 +1,23 @@
 from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from src.config import DATABASE_URL
+from src import config
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
+_engine = None
+
 def get_db():
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
         db.close()
 
 def get_engine():
-    return engine
\ No newline at end of file
+    """Return the shared engine, creating it (and validating DB settings) on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(config.DATABASE_URL)
+    return _engine
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import cv2
+from src.config import IMAGE_CACHE_ROOT, IMAGE_CACHE_SIZE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Padding colour used by the ultralytics letterbox transform
+LETTERBOX_COLOR = (114, 114, 114)
+# Largest stride of the YOLO models; padded sides only need to be a multiple of it
+LETTERBOX_STRIDE = 32
+
+
+class ImageCache:
+    """
+    Letterboxed, detector-sized copies of downloaded media plus a JSONL manifest
+    recording how each copy maps back to its source image. Running detection on the
+    cached copy skips decoding and resizing the full-resolution original.
+
+    Each copy also has a JSON sidecar next to it at a path derived from the source path,
+    so a long-running reader finds entries written by other processes after it loaded
+    the manifest.
+    """
+    def __init__(self, root: str = IMAGE_CACHE_ROOT, imgsz: int = IMAGE_CACHE_SIZE):
+        """
+        Initialize the cache for one detector input size.
+
+        Args:
+            root (str): Root directory of the cache.
+            imgsz (int): Square input size of the detector, e.g. 640.
+        """
+        self.imgsz = imgsz
+        self.cache_dir = os.path.join(root, str(imgsz))
+        self.manifest_path = os.path.join(self.cache_dir, "manifest.jsonl")
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(source_path: str) -> str:
+        return os.path.normpath(os.path.abspath(source_path))
+
+    def _paths(self, key: str):
+        """Return the (cached image, sidecar) paths for a source key."""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest[:2], digest)
+        return f"{base}.jpg", f"{base}.json"
+
+    def _read_sidecar(self, key: str):
+        _, sidecar_path = self._paths(key)
+        try:
+            with open(sidecar_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_manifest(self):
+        """Read the manifest once; later entries for the same source win."""
+        entries = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry['source_path']] = entry
+        self._entries = entries
+
+    def get(self, source_path: str):
+        """
+        Return the manifest entry for an image if its cached copy is present and current.
+
+        Args:
+            source_path (str): Path of the original image.
+
+        Returns:
+            dict or None: Entry with cache_path, orig_width/height, ratio, pad_x and pad_y.
+        """
+        key = self._key(source_path)
+        with self._lock:
+            if self._entries is None:
+                self._load_manifest()
+            entry = self._entries.get(key)
+        if entry is None or os.path.getmtime(source_path) > entry['source_mtime']:
+            # Possibly cached by another process since the manifest was read
+            entry = self._read_sidecar(key)
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+        if entry is None or not os.path.exists(entry['cache_path']):
+            return None
+        if os.path.getmtime(source_path) > entry['source_mtime']:
+            return None
+        return entry
+
+    def add(self, source_path: str):
+        """
+        Letterbox an image to the detector input size, write it and record it in the manifest.
+
+        Like the ultralytics default (auto) letterbox, the resized image is padded only up to
+        a multiple of the model stride rather than to a full square, so a 4:3 photo becomes
+        640x480 instead of 640x640 and inference does not spend compute on padding.
+
+        Args:
+            source_path (str): Path of the original image.
+
+        Returns:
+            dict or None: The new manifest entry, or None if the image could not be read.
+        """
+        image = cv2.imread(source_path)
+        if image is None:
+            logger.warning(f"Could not read image for cache: {source_path}")
+            return None
+
+        height, width = image.shape[:2]
+        ratio = min(self.imgsz / height, self.imgsz / width)
+        new_width, new_height = round(width * ratio), round(height * ratio)
+        if (new_width, new_height) != (width, height):
+            image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+        pad_x = ((self.imgsz - new_width) % LETTERBOX_STRIDE) / 2
+        pad_y = ((self.imgsz - new_height) % LETTERBOX_STRIDE) / 2
+        top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+        left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+
+        key = self._key(source_path)
+        cache_path, sidecar_path = self._paths(key)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        cv2.imwrite(cache_path, image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+
+        entry = {
+            'source_path': key,
+            'source_mtime': os.path.getmtime(source_path),
+            'cache_path': cache_path,
+            'orig_width': width,
+            'orig_height': height,
+            'ratio': ratio,
+            'pad_x': left,
+            'pad_y': top,
+        }
+        # Sidecar first and atomically, so a concurrent reader never sees a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(sidecar_path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, sidecar_path)
+        with self._lock:
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+            if self._entries is not None:
+                self._entries[key] = entry
+        return entry
+
+    def ensure(self, source_path: str):
+        """Return the current cache entry for an image, creating it if needed."""
+        return self.get(source_path) or self.add(source_path)
+
+    @staticmethod
+    def to_source_bbox(bbox, entry):
+        """Map an [x1, y1, x2, y2] box on the cached copy back to source image coordinates."""
+        x1, y1, x2, y2 = bbox
+        ratio = entry['ratio']
+        max_x, max_y = entry['orig_width'], entry['orig_height']
+        return [
+            min(max((x1 - entry['pad_x']) / ratio, 0), max_x),
+            min(max((y1 - entry['pad_y']) / ratio, 0), max_y),
+            min(max((x2 - entry['pad_x']) / ratio, 0), max_x),
+            min(max((y2 - entry['pad_y']) / ratio, 0), max_y),
+        ]
+
+
+if __name__ == "__main__":
+    import glob
+    cache = ImageCache()
+    image_files = [f for f in glob.glob("data/raw/media/**/*", recursive=True)
+                   if f.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.tiff'))]
+    for image_path in image_files:
+        cache.ensure(image_path)
+    logger.info(f"Cached {len(image_files)} images in {cache.cache_dir}")
@@ -0,0 +1,43 @@
+import os
+import logging
+import httpx
+from src.config import INFERENCE_SERVICE_URL
+
+logger = logging.getLogger(__name__)
+
+UDS_PREFIX = "unix://"
+
+
+def _client(service_url, timeout):
+    """Return an HTTP client and base URL for a service at http(s)://host:port or unix:///path/to.sock."""
+    if service_url.startswith(UDS_PREFIX):
+        transport = httpx.HTTPTransport(uds=service_url[len(UDS_PREFIX):])
+        return httpx.Client(transport=transport, timeout=timeout), "http://localhost"
+    return httpx.Client(timeout=timeout), service_url.rstrip('/')
+
+
+def submit_image(image_path, wait=False, service_url=INFERENCE_SERVICE_URL, timeout=30):
+    """
+    Submit an image to the detection service.
+
+    Args:
+        image_path (str): Path to the image; sent as an absolute path so the service can open it.
+        wait (bool): Block until the image's batch has been processed and return its detections.
+        service_url (str): Base URL of the detection service, or unix:///path/to.sock.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        dict or None: The service response, or None if the submission failed.
+    """
+    try:
+        client, base_url = _client(service_url, timeout)
+        with client:
+            response = client.post(
+                f"{base_url}/detect",
+                json={'image_path': os.path.abspath(image_path), 'wait': wait},
+            )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logger.warning(f"Could not submit {image_path} to detection service: {e}")
+        return None
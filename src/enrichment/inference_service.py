@@ -0,0 +1,161 @@
+"""
+Long-running detection service that keeps the YOLO model warm and groups concurrent
+submissions into micro-batches.
+
+    uvicorn src.enrichment.inference_service:app --host 127.0.0.1 --port 8001
+    uvicorn src.enrichment.inference_service:app --uds /tmp/yolo.sock   # INFERENCE_SERVICE_URL=unix:///tmp/yolo.sock
+"""
+import asyncio
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+from src.config import INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS, INFERENCE_QUEUE_SIZE
+from src.enrichment.yolo_detector import YOLODetector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class DetectRequest(BaseModel):
+    image_path: str
+    wait: bool = False
+
+
+class DetectResponse(BaseModel):
+    image_path: str
+    status: str
+    detections: Optional[List[dict]] = None
+
+
+class MicroBatcher:
+    """
+    Collects submitted image paths and runs them through the detector in batches.
+    A batch is dispatched when it reaches max_batch_size or max_wait_ms after its
+    first item arrived, whichever comes first.
+    """
+    def __init__(self, detector: YOLODetector, max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+                 max_wait_ms: float = INFERENCE_MAX_WAIT_MS, queue_size: int = INFERENCE_QUEUE_SIZE):
+        """
+        Initialize the batcher.
+
+        Args:
+            detector (YOLODetector): Detector holding the loaded model.
+            max_batch_size (int): Largest number of images per forward pass.
+            max_wait_ms (float): Longest time the first image of a batch waits for others.
+            queue_size (int): Pending submissions allowed before submitters block.
+        """
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.stats = {'batches': 0, 'images': 0, 'skipped': 0}
+
+    async def submit(self, image_path: str, wait: bool = False):
+        """Queue an image; when wait is set, return a future resolving to its detections."""
+        future = asyncio.get_running_loop().create_future() if wait else None
+        await self.queue.put((image_path, future))
+        return future
+
+    async def _next_batch(self):
+        """Wait for one item, then gather more until the batch is full or the wait expires."""
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _process(self, image_paths):
+        """Run inference and store detections for a batch; runs in a worker thread."""
+        pending, results, seen = [], {}, set()
+        for image_path in dict.fromkeys(image_paths):
+            key = self.detector.canonical_image_path(image_path)
+            message_id = self.detector.message_id_from_path(image_path)
+            if message_id is None or key in seen or self.detector.is_image_processed(image_path):
+                self.stats['skipped'] += 1
+                results[image_path] = []
+            else:
+                seen.add(key)
+                pending.append((image_path, message_id))
+
+        if pending:
+            try:
+                detections = self.detector.detect_objects_in_images([path for path, _ in pending])
+            except Exception as e:
+                # One unreadable image fails the whole forward pass; fall back to per-image inference
+                logger.warning(f"Batch inference failed ({e}); retrying {len(pending)} images individually")
+                detections = [self.detector.detect_objects_in_image(path) for path, _ in pending]
+            for (image_path, message_id), image_detections in zip(pending, detections):
+                self.detector.store_detections(message_id, image_path, image_detections)
+                results[image_path] = image_detections
+            self.stats['batches'] += 1
+            self.stats['images'] += len(pending)
+        return results
+
+    async def run(self):
+        """Dispatch batches until cancelled."""
+        while True:
+            batch = await self._next_batch()
+            try:
+                results = await asyncio.to_thread(self._process, [path for path, _ in batch])
+                for image_path, future in batch:
+                    if future is not None and not future.done():
+                        future.set_result(results[image_path])
+            except Exception as e:
+                logger.error(f"Error processing batch of {len(batch)} images: {e}")
+                for _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+
+
+def _warm_up(detector: YOLODetector):
+    """Run one dummy inference so the first real batch doesn't pay model initialization."""
+    detector.model(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    detector = YOLODetector()
+    detector.create_detections_table()
+    await asyncio.to_thread(_warm_up, detector)
+    app.state.batcher = MicroBatcher(detector)
+    worker = asyncio.create_task(app.state.batcher.run())
+    logger.info("Detection service ready")
+    yield
+    worker.cancel()
+
+
+app = FastAPI(
+    title="YOLO Detection Service",
+    description="Warm YOLO model with micro-batched inference into raw.image_detections",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+
+@app.get("/health")
+async def health():
+    batcher = app.state.batcher
+    return {"status": "ok", "queued": batcher.queue.qsize(), **batcher.stats}
+
+
+@app.post("/detect", response_model=DetectResponse)
+async def detect(request: DetectRequest):
+    """Submit an image for detection; with wait=true, respond once its batch has been processed"""
+    future = await app.state.batcher.submit(request.image_path, wait=request.wait)
+    if future is None:
+        return DetectResponse(image_path=request.image_path, status="queued")
+    try:
+        detections = await future
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Detection failed: {e}")
+    return DetectResponse(image_path=request.image_path, status="processed", detections=detections)
@@ -4,35 +4,59 @@ from ultralytics import YOLO
 from PIL import Image
 import json
 from src.database import get_engine
+from src.config import IMAGE_CACHE_ENABLED, IMAGE_CACHE_SIZE
+from src.enrichment.image_cache import ImageCache
 from sqlalchemy import text
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Media layout written by the scraper: <MEDIA_ROOT>/<channel>/<date>/<message_id>_<timestamp>.<ext>
+MEDIA_ROOT = "data/raw/media"
+
 class YOLODetector:
-    def __init__(self):
-        """Initialize YOLO model and database engine."""
+    def __init__(self, use_cache=IMAGE_CACHE_ENABLED):
+        """Initialize YOLO model and database engine, reading inputs from the letterboxed image cache if enabled."""
         self.model = YOLO('yolov8n.pt')  # Load YOLOv8 nano model
         self.engine = get_engine()
+        self.cache = ImageCache(imgsz=IMAGE_CACHE_SIZE) if use_cache else None
+    
+    def _inference_input(self, image_path):
+        """Return (path to run the model on, cache entry or None), populating the cache as needed."""
+        if self.cache is None:
+            return image_path, None
+        entry = self.cache.ensure(image_path)
+        if entry is None:
+            return image_path, None
+        return entry['cache_path'], entry
+    
+    def _parse_result(self, result, cache_entry=None):
+        """Convert one ultralytics result into a list of detection dicts, in source image coordinates."""
+        detections = []
+        boxes = result.boxes
+        if boxes is not None:
+            for box in boxes:
+                detection = {
+                    'class_id': int(box.cls[0]),
+                    'class_name': self.model.names[int(box.cls[0])],
+                    'confidence': float(box.conf[0]),
+                    'bbox': box.xyxy[0].tolist()
+                }
+                if cache_entry is not None:
+                    detection['bbox'] = ImageCache.to_source_bbox(detection['bbox'], cache_entry)
+                detections.append(detection)
+        return detections
     
     def detect_objects_in_image(self, image_path):
         """Run YOLO detection on a single image and return detections."""
         try:
-            results = self.model(image_path)
+            input_path, cache_entry = self._inference_input(image_path)
+            results = self.model(input_path, imgsz=IMAGE_CACHE_SIZE)
             detections = []
             
             for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        detection = {
-                            'class_id': int(box.cls[0]),
-                            'class_name': self.model.names[int(box.cls[0])],
-                            'confidence': float(box.conf[0]),
-                            'bbox': box.xyxy[0].tolist()
-                        }
-                        detections.append(detection)
+                detections.extend(self._parse_result(result, cache_entry))
             
             return detections
             
@@ -40,10 +64,19 @@ class YOLODetector:
             logger.error(f"Error detecting objects in {image_path}: {e}")
             return []
     
+    def detect_objects_in_images(self, image_paths):
+        """Run YOLO detection on a batch of images in one forward pass; returns one detection list per image."""
+        inputs = [self._inference_input(path) for path in image_paths]
+        results = self.model([path for path, _ in inputs], imgsz=IMAGE_CACHE_SIZE, verbose=False)
+        return [self._parse_result(result, entry) for result, (_, entry) in zip(results, inputs)]
+    
     def process_all_images(self):
         """Process all images in the media directory, skipping already-processed ones."""
-        image_pattern = "../../data/raw/media/**/*"
-        image_files = glob.glob(image_pattern, recursive=True)
+        return self.process_images(os.path.join("..", "..", MEDIA_ROOT))
+    
+    def process_images(self, image_dir):
+        """Process all images under a directory, skipping already-processed ones. Returns the number of images found."""
+        image_files = glob.glob(os.path.join(image_dir, "**", "*"), recursive=True)
         
         # Filter for image files
         image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
@@ -51,6 +84,16 @@ class YOLODetector:
         
         for image_path in image_files:
             self.process_single_image(image_path)
+        return len(image_files)
+    
+    @staticmethod
+    def canonical_image_path(image_path):
+        """
+        Key an image by its location under MEDIA_ROOT, whatever path or working directory it was
+        reached from, so the batch job, the streaming mode and the detection service agree on it.
+        """
+        parts = os.path.normpath(os.path.abspath(image_path)).split(os.sep)
+        return "/".join([MEDIA_ROOT] + parts[-3:])
     
     def is_image_processed(self, image_path):
         """Check if the image has already been processed (exists in the database)."""
@@ -58,7 +101,7 @@ class YOLODetector:
             query = text("""
                 SELECT 1 FROM raw.image_detections WHERE image_path = :image_path LIMIT 1
             """)
-            result = conn.execute(query, {'image_path': image_path}).fetchone()
+            result = conn.execute(query, {'image_path': self.canonical_image_path(image_path)}).fetchone()
             return result is not None
     
     def process_single_image(self, image_path):
@@ -67,38 +110,51 @@ class YOLODetector:
             if self.is_image_processed(image_path):
                 logger.info(f"Skipping already-processed image: {image_path}")
                 return
-            # Extract message_id from filename
-            filename = os.path.basename(image_path)
-            # Handle different filename formats
-            # if filename.startswith('photo_'):
-            #     logger.warning(f"Skipping file with non-message format: {filename}")
-            #     return
-            try:
-                message_id = int(filename.split('_')[0])
-            except Exception:
-                logger.warning(f"Could not extract message_id from filename: {filename}")
+            message_id = self.message_id_from_path(image_path)
+            if message_id is None:
                 return
             detections = self.detect_objects_in_image(image_path)
-            # Store detections in database
-            with self.engine.connect() as conn:
-                for detection in detections:
-                    query = text("""
-                        INSERT INTO raw.image_detections 
-                        (message_id, image_path, detected_class, confidence_score, bbox_coordinates)
-                        VALUES (:message_id, :image_path, :detected_class, :confidence_score, :bbox_coordinates)
-                    """)
-                    conn.execute(query, {
-                        'message_id': message_id,
-                        'image_path': image_path,
-                        'detected_class': detection['class_name'],
-                        'confidence_score': detection['confidence'],
-                        'bbox_coordinates': json.dumps(detection['bbox'])
-                    })
-                conn.commit()
-                logger.info(f"Processed {len(detections)} detections for {image_path}")
+            self.store_detections(message_id, image_path, detections)
         except Exception as e:
             logger.error(f"Error processing image {image_path}: {e}")
     
+    def message_id_from_path(self, image_path):
+        """Extract the message_id from a '<message_id>_<timestamp>.<ext>' filename, or None."""
+        filename = os.path.basename(image_path)
+        # Handle different filename formats
+        # if filename.startswith('photo_'):
+        #     logger.warning(f"Skipping file with non-message format: {filename}")
+        #     return
+        try:
+            return int(filename.split('_')[0])
+        except Exception:
+            logger.warning(f"Could not extract message_id from filename: {filename}")
+            return None
+    
+    def store_detections(self, message_id, image_path, detections):
+        """Store an image's detections in raw.image_detections."""
+        if not detections:
+            logger.info(f"Processed 0 detections for {image_path}")
+            return
+        with self.engine.connect() as conn:
+            query = text("""
+                INSERT INTO raw.image_detections 
+                (message_id, image_path, detected_class, confidence_score, bbox_coordinates)
+                VALUES (:message_id, :image_path, :detected_class, :confidence_score, :bbox_coordinates)
+            """)
+            conn.execute(query, [
+                {
+                    'message_id': message_id,
+                    'image_path': self.canonical_image_path(image_path),
+                    'detected_class': detection['class_name'],
+                    'confidence_score': detection['confidence'],
+                    'bbox_coordinates': json.dumps(detection['bbox'])
+                }
+                for detection in detections
+            ])
+            conn.commit()
+            logger.info(f"Processed {len(detections)} detections for {image_path}")
+    
     def create_detections_table(self):
         """Create the image detections table if it doesn't exist."""
         with self.engine.connect() as conn:
@@ -114,6 +170,22 @@ class YOLODetector:
                 )
             """)
             conn.execute(query)
+            # Watermark index for incremental dbt models
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_image_detections_created_at
+                    ON raw.image_detections (created_at)
+            """))
+            # Rewrite rows stored under other path forms (e.g. '../../data/raw/media/...' or
+            # Windows paths) to canonical_image_path's form, so they still count as processed
+            result = conn.execute(text(r"""
+                UPDATE raw.image_detections
+                SET image_path = :media_root || '/'
+                    || SUBSTRING(REPLACE(image_path, '\', '/') FROM '([^/]+/[^/]+/[^/]+)$')
+                WHERE image_path NOT LIKE :media_root || '/%'
+                    AND REPLACE(image_path, '\', '/') ~ '[^/]+/[^/]+/[^/]+$'
+            """), {'media_root': MEDIA_ROOT})
+            if result.rowcount:
+                logger.info(f"Migrated {result.rowcount} detections to canonical image paths")
             conn.commit()
 
 if __name__ == "__main__":
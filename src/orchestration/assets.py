@@ -0,0 +1,127 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from dagster import (
+    asset,
+    AssetExecutionContext,
+    AutoMaterializePolicy,
+    DailyPartitionsDefinition,
+    MultiPartitionsDefinition,
+    StaticPartitionsDefinition,
+    Output,
+)
+from src.config import TELEGRAM_CHANNELS, PARTITION_START_DATE, PIPELINE_PROFILE_DIR
+from src.telemetry import PipelineRun
+
+channel_day_partitions = MultiPartitionsDefinition({
+    "channel": StaticPartitionsDefinition([c.replace('@', '') for c in TELEGRAM_CHANNELS]),
+    "date": DailyPartitionsDefinition(start_date=PARTITION_START_DATE),
+})
+
+# Op-level concurrency keys; limits are set on the instance, e.g.
+#   dagster instance concurrency set telegram_session 1
+#   dagster instance concurrency set yolo_inference 2
+TELEGRAM_CONCURRENCY_KEY = "telegram_session"
+YOLO_CONCURRENCY_KEY = "yolo_inference"
+
+
+def _partition(context: AssetExecutionContext):
+    """Return the (channel, date string) of the partition being materialized."""
+    keys = context.partition_key.keys_by_dimension
+    return keys["channel"], keys["date"]
+
+
+def _stage(context: AssetExecutionContext, name: str):
+    """Record metrics for this step under the Dagster run id."""
+    run = PipelineRun(run_id=context.run_id, source='dagster', profile_dir=PIPELINE_PROFILE_DIR)
+    partition = str(context.partition_key) if context.has_partition_key else None
+    return run.stage(name, partition=partition)
+
+
+@asset(
+    partitions_def=channel_day_partitions,
+    op_tags={"dagster/concurrency_key": TELEGRAM_CONCURRENCY_KEY},
+    compute_kind="telethon",
+)
+def raw_telegram_messages(context: AssetExecutionContext):
+    """Messages and media for one channel and day, written to data/raw."""
+    from src.scraping.telegram_scraper import TelegramScraper
+
+    channel, date_str = _partition(context)
+    start = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    end = start + timedelta(days=1)
+
+    async def run_scraper():
+        scraper = TelegramScraper()
+        try:
+            messages = await scraper.scrape_channel(channel, limit=None, start_date=start, end_date=end)
+            return messages, scraper.save_to_json(messages, channel, date_str=date_str)
+        finally:
+            await scraper.client.disconnect()
+
+    with _stage(context, "scraping") as stage:
+        messages, json_path = asyncio.run(run_scraper())
+        stage.items = len(messages)
+    if json_path is None:
+        raise Exception(f"Failed to save messages for {channel} on {date_str}")
+    context.log.info(f"Scraped {len(messages)} messages from {channel} for {date_str}")
+    return Output(json_path, metadata={"messages": len(messages), "path": json_path})
+
+
+@asset(
+    partitions_def=channel_day_partitions,
+    compute_kind="postgres",
+)
+def loaded_telegram_messages(context: AssetExecutionContext, raw_telegram_messages):
+    """The partition's messages loaded into raw.telegram_messages, replacing any earlier load."""
+    from src.scraping.data_loader import DataLoader
+
+    with _stage(context, "loading") as stage:
+        loader = DataLoader()
+        count = loader.load_json_to_postgres(raw_telegram_messages, raise_errors=True,
+                                             partition=_partition(context))
+        stage.items = count
+    context.log.info(f"Loaded {count} records from {raw_telegram_messages}")
+    return Output(count, metadata={"rows": count})
+
+
+@asset(
+    partitions_def=channel_day_partitions,
+    deps=[raw_telegram_messages],
+    op_tags={"dagster/concurrency_key": YOLO_CONCURRENCY_KEY},
+    compute_kind="yolo",
+)
+def image_detections(context: AssetExecutionContext):
+    """YOLO detections for the partition's downloaded images, stored in raw.image_detections."""
+    from src.enrichment.yolo_detector import YOLODetector
+
+    channel, date_str = _partition(context)
+    media_dir = os.path.join("data", "raw", "media", channel, date_str)
+    if not os.path.isdir(media_dir):
+        context.log.info(f"No media for {channel} on {date_str}")
+        return Output(0, metadata={"images": 0})
+
+    with _stage(context, "enrichment") as stage:
+        detector = YOLODetector()
+        detector.create_detections_table()
+        count = detector.process_images(media_dir)
+        stage.items = count
+    return Output(count, metadata={"images": count})
+
+
+@asset(
+    deps=[loaded_telegram_messages, image_detections],
+    auto_materialize_policy=AutoMaterializePolicy.eager(),
+    compute_kind="dbt",
+)
+def dbt_marts(context: AssetExecutionContext):
+    """Staging views and marts, rebuilt for the sources that changed since the last build."""
+    from src.transformation.dbt_runner import get_dbt_runner
+
+    with _stage(context, "transformation") as stage:
+        results = get_dbt_runner().build_changed()
+        stage.items = len(results)
+        failed = [r['unique_id'] for r in results if r['status'] in ('error', 'fail')]
+        if failed:
+            raise Exception(f"dbt build failed for: {failed}")
+    return Output(len(results), metadata={"nodes": len(results)})
@@ -1,18 +1,17 @@
-from dagster import job, schedule, DefaultScheduleStatus
-
-from src.orchestration.ops import (
-    scrape_telegram_data_op,
-    load_raw_to_postgres_op,
-    run_dbt_transformations_op,
-    run_yolo_enrichment_op,
-)
-
-@job
-def telegram_pipeline_job():
-    raw_data = scrape_telegram_data_op()
-    loaded_data = load_raw_to_postgres_op(raw_data)
-    transformed_data = run_dbt_transformations_op(loaded_data)
-    run_yolo_enrichment_op(transformed_data)
+from dagster import define_asset_job, multiprocess_executor, AssetSelection
 
+from src.orchestration.assets import channel_day_partitions
 
+# Scrape, load and enrich one channel/day partition. Load and enrich run in
+# parallel once scraping finishes; backfills launch one run per partition.
+telegram_pipeline_job = define_asset_job(
+    name="telegram_pipeline_job",
+    selection=AssetSelection.keys("raw_telegram_messages", "loaded_telegram_messages", "image_detections"),
+    partitions_def=channel_day_partitions,
+    executor_def=multiprocess_executor.configured({"max_concurrent": 4}),
+)
 
+dbt_marts_job = define_asset_job(
+    name="dbt_marts_job",
+    selection=AssetSelection.keys("dbt_marts"),
+)
@@ -1,8 +1,12 @@
 from dagster import Definitions
-from src.orchestration.jobs import telegram_pipeline_job
+from src.orchestration.assets import raw_telegram_messages, loaded_telegram_messages, image_detections, dbt_marts
+from src.orchestration.jobs import telegram_pipeline_job, dbt_marts_job
 from src.orchestration.schedules import daily_schedule
+from src.orchestration.sensors import pipeline_run_succeeded, pipeline_run_failed, pipeline_run_canceled
 
 defs = Definitions(
-    jobs=[telegram_pipeline_job],
+    assets=[raw_telegram_messages, loaded_telegram_messages, image_detections, dbt_marts],
+    jobs=[telegram_pipeline_job, dbt_marts_job],
     schedules=[daily_schedule],
+    sensors=[pipeline_run_succeeded, pipeline_run_failed, pipeline_run_canceled],
 )
@@ -1,9 +1,18 @@
+from datetime import timedelta
+from dagster import schedule, RunRequest, MultiPartitionKey
 
-from dagster import ScheduleDefinition
 from src.orchestration.jobs import telegram_pipeline_job
+from src.orchestration.assets import channel_day_partitions
 
-daily_schedule = ScheduleDefinition(
+
+@schedule(
     job=telegram_pipeline_job,
     cron_schedule="0 2 * * *",
     name="daily_telegram_pipeline",
-)
\ No newline at end of file
+)
+def daily_schedule(context):
+    """Request yesterday's partition for every channel."""
+    date_str = (context.scheduled_execution_time - timedelta(days=1)).strftime("%Y-%m-%d")
+    for channel in channel_day_partitions.get_partitions_def_for_dimension("channel").get_partition_keys():
+        partition_key = MultiPartitionKey({"channel": channel, "date": date_str})
+        yield RunRequest(run_key=str(partition_key), partition_key=partition_key)
@@ -0,0 +1,31 @@
+from dagster import DagsterRunStatus, DefaultSensorStatus, RunStatusSensorContext, run_status_sensor
+
+from src.telemetry import PipelineRun
+
+# Dagster steps record their stages under the Dagster run id but, running in separate
+# processes, none of them knows when the run as a whole is over; these close the run row.
+
+
+def _finish(context: RunStatusSensorContext, status: str):
+    PipelineRun(run_id=context.dagster_run.run_id, source='dagster').finish(status=status)
+
+
+@run_status_sensor(run_status=DagsterRunStatus.SUCCESS, name="pipeline_run_succeeded",
+                   default_status=DefaultSensorStatus.RUNNING)
+def pipeline_run_succeeded(context: RunStatusSensorContext):
+    """Mark the run's monitoring.pipeline_runs row succeeded."""
+    _finish(context, 'succeeded')
+
+
+@run_status_sensor(run_status=DagsterRunStatus.FAILURE, name="pipeline_run_failed",
+                   default_status=DefaultSensorStatus.RUNNING)
+def pipeline_run_failed(context: RunStatusSensorContext):
+    """Mark the run's monitoring.pipeline_runs row failed."""
+    _finish(context, 'failed')
+
+
+@run_status_sensor(run_status=DagsterRunStatus.CANCELED, name="pipeline_run_canceled",
+                   default_status=DefaultSensorStatus.RUNNING)
+def pipeline_run_canceled(context: RunStatusSensorContext):
+    """Mark the run's monitoring.pipeline_runs row canceled."""
+    _finish(context, 'canceled')
@@ -0,0 +1,104 @@
+import glob
+import json
+import logging
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RAW_JSON_ROOT = "data/raw/telegram_messages"
+ARCHIVE_ROOT = "data/archive/telegram_messages"
+
+# Columns of raw.telegram_messages, in COPY order
+ARCHIVE_SCHEMA = pa.schema([
+    ('message_id', pa.int64()),
+    ('channel_name', pa.string()),
+    ('message_text', pa.string()),
+    ('message_date', pa.timestamp('us')),
+    ('has_media', pa.bool_()),
+    ('media_type', pa.string()),
+    ('scraped_at', pa.timestamp('us')),
+    ('raw_data', pa.string()),
+    ('message_day', pa.string()),
+])
+PARTITION_COLUMNS = ['channel_name', 'message_day']
+
+
+def _to_utc_naive(values):
+    """Parse ISO timestamps to naive UTC, matching how Postgres stores them in a TIMESTAMP column."""
+    return pd.to_datetime(values, utc=True, errors='coerce', format='ISO8601').dt.tz_convert(None)
+
+
+def json_file_to_table(json_file_path):
+    """
+    Read one scraped JSON file into an Arrow table with the archive schema.
+
+    Args:
+        json_file_path (str): Path to a data/raw/telegram_messages JSON file.
+
+    Returns:
+        pyarrow.Table: The file's messages, or None if it holds no records.
+    """
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not data:
+        return None
+
+    df = pd.DataFrame.from_records(data)
+    df['message_date'] = _to_utc_naive(df['message_date'])
+    df['scraped_at'] = _to_utc_naive(df['scraped_at'])
+    df['raw_data'] = df['raw_data'].map(json.dumps)
+    df['message_day'] = df['message_date'].dt.strftime('%Y-%m-%d').fillna('unknown')
+    return pa.Table.from_pandas(df[ARCHIVE_SCHEMA.names], schema=ARCHIVE_SCHEMA, preserve_index=False)
+
+
+def convert_json_to_archive(json_root=RAW_JSON_ROOT, archive_root=ARCHIVE_ROOT, compression='zstd'):
+    """
+    Convert the raw JSON layer into a Parquet archive partitioned by channel and message day.
+    Re-converting a JSON file overwrites its earlier output rather than duplicating it.
+
+    Args:
+        json_root (str): Root of the raw JSON layer.
+        archive_root (str): Root directory of the Parquet archive.
+        compression (str): Parquet compression codec.
+
+    Returns:
+        int: Number of messages archived.
+    """
+    total = 0
+    for json_file in sorted(glob.glob(os.path.join(json_root, "**", "*.json"), recursive=True)):
+        try:
+            table = json_file_to_table(json_file)
+            if table is None:
+                continue
+            # Name output files after their source so a re-run replaces them
+            scrape_date = os.path.basename(os.path.dirname(json_file))
+            stem = os.path.splitext(os.path.basename(json_file))[0]
+            ds.write_dataset(
+                table,
+                archive_root,
+                format='parquet',
+                partitioning=PARTITION_COLUMNS,
+                partitioning_flavor='hive',
+                basename_template=f"{scrape_date}_{stem}_{{i}}.parquet",
+                existing_data_behavior='overwrite_or_ignore',
+                file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+            )
+            total += table.num_rows
+            logger.info(f"Archived {table.num_rows} records from {json_file}")
+        except Exception as e:
+            logger.error(f"Error archiving {json_file}: {e}")
+    return total
+
+
+def open_archive(archive_root=ARCHIVE_ROOT):
+    """Open the Parquet archive as a dataset with its channel/day partition columns."""
+    return ds.dataset(archive_root, format='parquet', partitioning='hive', schema=ARCHIVE_SCHEMA)
+
+
+if __name__ == "__main__":
+    count = convert_json_to_archive()
+    logger.info(f"Archived {count} messages to {ARCHIVE_ROOT}")
@@ -4,6 +4,7 @@ import glob
 from datetime import datetime
 from sqlalchemy import text
 from src.database import get_engine
+from src.scraping.price_extractor import extract_prices
 import logging 
 
 logging.basicConfig(level=logging.INFO)
@@ -38,25 +39,61 @@ class DataLoader:
                         has_media BOOLEAN,
                         media_type VARCHAR(50),
                         scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        raw_data JSONB
+                        raw_data JSONB,
+                        loaded_at TIMESTAMP DEFAULT now()
                     );
+                    -- When the row reached the database; scraped_at comes from the JSON and
+                    -- can be older than rows already transformed (late files, archive replay)
+                    ALTER TABLE raw.telegram_messages
+                        ADD COLUMN IF NOT EXISTS loaded_at TIMESTAMP DEFAULT now();
+                    -- Watermark index for incremental dbt models
+                    CREATE INDEX IF NOT EXISTS idx_telegram_messages_loaded_at
+                        ON raw.telegram_messages (loaded_at);
+                    CREATE TABLE IF NOT EXISTS raw.message_prices (
+                        id SERIAL PRIMARY KEY,
+                        message_id BIGINT NOT NULL,
+                        channel_name VARCHAR(255) NOT NULL,
+                        message_date TIMESTAMP,
+                        match_index SMALLINT NOT NULL,
+                        amount NUMERIC(12, 2) NOT NULL,
+                        currency CHAR(3) NOT NULL,
+                        product VARCHAR(100),
+                        raw_match TEXT,
+                        extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE (channel_name, message_id, match_index)
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_message_prices_product_date
+                        ON raw.message_prices (product, message_date);
+                    CREATE INDEX IF NOT EXISTS idx_message_prices_channel_date
+                        ON raw.message_prices (channel_name, message_date);
+                    CREATE INDEX IF NOT EXISTS idx_message_prices_extracted_at
+                        ON raw.message_prices (extracted_at);
                 """))
                 conn.commit()
         except Exception as e:
             logger.error(f"Error creating tables: {e}")
     
-    def load_json_to_postgres(self, json_file_path):
+    def load_json_to_postgres(self, json_file_path, raise_errors=False, partition=None):
         """
         Load a single JSON file's data into the PostgreSQL raw.telegram_messages table.
 
         Args:
             json_file_path (str): Path to the JSON file.
+            raise_errors (bool): Re-raise load errors instead of logging and returning 0.
+            partition (tuple): (channel_name, 'YYYY-MM-DD') the file holds. That channel/day's
+                existing messages and prices are replaced in the same transaction, so loading a
+                partition again (retry, backfill) does not duplicate rows.
+
+        Returns:
+            int: Number of records loaded, or 0 if loading failed.
         """
         try:
             with open(json_file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
             with self.engine.connect() as conn:
+                if partition is not None:
+                    self.delete_partition(conn, *partition)
                 for record in data:
                     query = text("""
                         INSERT INTO raw.telegram_messages 
@@ -78,24 +115,168 @@ class DataLoader:
                         'raw_data': json.dumps(record['raw_data'])
                     })
                 
+                self.load_prices(conn, data)
                 conn.commit()
                 logger.info(f"Loaded {len(data)} records from {json_file_path}")
+                return len(data)
                 
         except Exception as e:
             logger.error(f"Error loading {json_file_path}: {e}")
+            if raise_errors:
+                raise
+            return 0
+    
+    def delete_partition(self, conn, channel_name, date_str):
+        """
+        Delete one channel/day's messages and prices ahead of reloading them.
+
+        Args:
+            conn: Open SQLAlchemy connection; the caller commits.
+            channel_name (str): Channel name, with or without '@'.
+            date_str (str): Message day (YYYY-MM-DD, UTC), or 'unknown' for messages without
+                a date, as in the Parquet archive's partitioning.
+
+        Returns:
+            int: Number of messages deleted.
+        """
+        params = {'channel_name': channel_name.replace('@', ''), 'day': date_str}
+        if date_str == 'unknown':
+            day_filter = "message_date IS NULL"
+        else:
+            day_filter = "message_date >= CAST(:day AS DATE) AND message_date < CAST(:day AS DATE) + 1"
+        conn.execute(text(f"""
+            DELETE FROM raw.message_prices
+            WHERE channel_name = :channel_name AND {day_filter}
+        """), params)
+        result = conn.execute(text(f"""
+            DELETE FROM raw.telegram_messages
+            WHERE channel_name = :channel_name AND {day_filter}
+        """), params)
+        if result.rowcount:
+            logger.info(f"Replacing {result.rowcount} existing records for {channel_name} on {date_str}")
+        return result.rowcount
+    
+    def load_prices(self, conn, records):
+        """
+        Extract price mentions from message records and store them in raw.message_prices.
+
+        Args:
+            conn: Open SQLAlchemy connection; the caller commits.
+            records (list): Message dicts with message_id, channel_name, message_text and message_date.
+
+        Returns:
+            int: Number of price rows extracted.
+        """
+        rows = [
+            {
+                'message_id': record['message_id'],
+                'channel_name': record['channel_name'],
+                'message_date': record['message_date'],
+                **price,
+            }
+            for record in records
+            for price in extract_prices(record.get('message_text'))
+        ]
+        if rows:
+            conn.execute(text("""
+                INSERT INTO raw.message_prices
+                (message_id, channel_name, message_date, match_index, amount, currency, product, raw_match)
+                VALUES (:message_id, :channel_name, :message_date, :match_index, :amount, :currency,
+                        :product, :raw_match)
+                ON CONFLICT (channel_name, message_id, match_index) DO NOTHING
+            """), rows)
+        return len(rows)
     
     def load_all_json_files(self):
         """
         Load all JSON files from the raw data directory into the database.
+
+        Returns:
+            int: Total number of records loaded.
         """
+        total = 0
         try:
             pattern = "data/raw/telegram_messages/**/*.json"
             json_files = glob.glob(pattern, recursive=True)
             
             for json_file in json_files:
-                self.load_json_to_postgres(json_file)
+                total += self.load_json_to_postgres(json_file)
         except Exception as e:
             logger.error(f"Error loading all JSON files: {e}")
+        return total
+
+    def replay_archive(self, archive_root=None, channels=None, truncate=False, batch_size=100_000):
+        """
+        Stream the Parquet archive into raw.telegram_messages with COPY, one record batch at a time,
+        re-extracting each batch's prices into raw.message_prices. Without truncate, every
+        replayed channel/day is deleted first in the same transaction, so a replay never
+        duplicates messages that are already loaded.
+
+        Args:
+            archive_root (str): Root of the Parquet archive. Defaults to archive.ARCHIVE_ROOT.
+            channels (list): Only replay these channels.
+            truncate (bool): Empty raw.telegram_messages and raw.message_prices first, for a full rebuild.
+            batch_size (int): Maximum rows per COPY batch.
+
+        Returns:
+            int: Number of records copied.
+        """
+        import io
+        import pyarrow.csv as pa_csv
+        import pyarrow.dataset as ds
+        from psycopg2.extras import execute_values
+        from src.scraping.archive import ARCHIVE_ROOT, PARTITION_COLUMNS, open_archive
+
+        columns = ['message_id', 'channel_name', 'message_text', 'message_date',
+                   'has_media', 'media_type', 'scraped_at', 'raw_data']
+        dataset = open_archive(archive_root or ARCHIVE_ROOT)
+        row_filter = ds.field('channel_name').isin(channels) if channels else None
+        copy_sql = f"COPY raw.telegram_messages ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, HEADER true)"
+
+        total = 0
+        try:
+            # COPY goes through the DBAPI cursor of the same connection, inside one transaction
+            with self.engine.connect() as conn, conn.begin():
+                if truncate:
+                    conn.execute(text("TRUNCATE raw.telegram_messages, raw.message_prices"))
+                else:
+                    partitions = {
+                        tuple(ds.get_partition_keys(fragment.partition_expression).get(column)
+                              for column in PARTITION_COLUMNS)
+                        for fragment in dataset.get_fragments(filter=row_filter)
+                    }
+                    for channel_name, message_day in sorted(partitions):
+                        self.delete_partition(conn, channel_name, message_day)
+                cursor = conn.connection.cursor()
+                for batch in dataset.to_batches(columns=columns, filter=row_filter, batch_size=batch_size):
+                    if batch.num_rows == 0:
+                        continue
+                    buffer = io.BytesIO()
+                    pa_csv.write_csv(batch, buffer)
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_sql, buffer)
+
+                    records = zip(*(batch.column(name).to_pylist()
+                                    for name in ('message_id', 'channel_name', 'message_date', 'message_text')))
+                    prices = [
+                        (message_id, channel_name, message_date, price['match_index'], price['amount'],
+                         price['currency'], price['product'], price['raw_match'])
+                        for message_id, channel_name, message_date, message_text in records
+                        for price in extract_prices(message_text)
+                    ]
+                    if prices:
+                        execute_values(cursor, """
+                            INSERT INTO raw.message_prices
+                            (message_id, channel_name, message_date, match_index, amount, currency, product, raw_match)
+                            VALUES %s
+                            ON CONFLICT (channel_name, message_id, match_index) DO NOTHING
+                        """, prices)
+                    total += batch.num_rows
+                    logger.info(f"Copied {batch.num_rows} records ({total} total)")
+        except Exception as e:
+            logger.error(f"Error replaying archive: {e}")
+            raise
+        return total
 
 if __name__ == "__main__":
     loader = DataLoader()
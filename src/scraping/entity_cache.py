@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+from src.config import ENTITY_CACHE_PATH, ENTITY_CACHE_TTL_DAYS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class EntityCache:
+    """
+    Persistent store of resolved Telegram channel entities keyed by username.
+    Telethon's get_entity resolves a username with a heavily rate-limited request
+    on every call; the cached id and access_hash are enough to build an input peer.
+    """
+    def __init__(self, path: str = ENTITY_CACHE_PATH, ttl_days: float = ENTITY_CACHE_TTL_DAYS):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): JSON file holding the cached entities.
+            ttl_days (float): Age after which an entry is re-resolved; 0 disables expiry.
+        """
+        self.path = path
+        self.ttl = timedelta(days=ttl_days) if ttl_days else None
+        self._entries = None
+
+    @staticmethod
+    def _key(channel_name: str) -> str:
+        return channel_name.replace('@', '').lower()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable entity cache {self.path}: {e}")
+            return {}
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _save(self, key, entry):
+        """
+        Write one key's change. Other processes (e.g. parallel Dagster steps) may have saved
+        since this one loaded the file, so their entries are re-read and merged first, and the
+        file is replaced through a temp file unique to this write.
+        """
+        entries = self._read()
+        if entry is None:
+            entries.pop(key, None)
+        else:
+            entries[key] = entry
+        self._entries = entries
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.entities-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, channel_name: str):
+        """
+        Return the cached entry for a channel if present and not expired.
+
+        Args:
+            channel_name (str): Channel username, with or without '@'.
+
+        Returns:
+            dict or None: Entry with id, access_hash, title and resolved_at.
+        """
+        entry = self._load().get(self._key(channel_name))
+        if entry is None:
+            return None
+        if self.ttl and datetime.now() - datetime.fromisoformat(entry['resolved_at']) > self.ttl:
+            return None
+        return entry
+
+    def put(self, channel_name: str, entity):
+        """
+        Record a freshly resolved channel entity.
+
+        Args:
+            channel_name (str): Channel username, with or without '@'.
+            entity: Channel returned by get_entity.
+
+        Returns:
+            dict: The stored entry.
+        """
+        entry = {
+            'id': entity.id,
+            'access_hash': entity.access_hash,
+            'title': getattr(entity, 'title', None),
+            'resolved_at': datetime.now().isoformat(),
+        }
+        try:
+            self._save(self._key(channel_name), entry)
+        except OSError as e:
+            # The entity is resolved either way; failing to cache it must not fail the scrape
+            logger.warning(f"Could not write entity cache {self.path}: {e}")
+        return entry
+
+    def invalidate(self, channel_name: str):
+        """Drop a channel's entry, e.g. after its cached peer was rejected."""
+        try:
+            self._save(self._key(channel_name), None)
+        except OSError as e:
+            logger.warning(f"Could not write entity cache {self.path}: {e}")
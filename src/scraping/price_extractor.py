@@ -0,0 +1,76 @@
+import re
+from typing import List, Dict, Any
+
+# Product tokens linked to prices; matches the vocabulary used by the top-products report
+PRODUCT_TOKENS = [
+    'paracetamol', 'aspirin', 'ibuprofen', 'amoxicillin', 'vitamin', 'medicine',
+    'drug', 'tablet', 'capsule', 'syrup', 'cream', 'lotion', 'serum', 'sunscreen',
+    'shampoo', 'soap', 'perfume', 'mask', 'glove', 'sanitizer',
+]
+
+CURRENCY_CODES = {
+    'birr': 'ETB', 'br': 'ETB', 'br.': 'ETB', 'etb': 'ETB', 'ብር': 'ETB',
+    'usd': 'USD', '$': 'USD',
+}
+
+# At most 7 integer digits with no leading zero, so phone numbers next to a currency word
+# ("+251911234567 Birr 250", "0911234567 birr 80") are not read as prices. The lookarounds
+# keep an amount from starting or ending mid-number, e.g. the 500 in "1.500".
+_AMOUNT = (
+    r'(?<![\d.,+])'
+    r'(?:[1-9],\d{3},\d{3}|[1-9]\d{0,2},\d{3}|[1-9]\d{0,6})(?:\.\d{1,2})?'
+    r'(?![\d]|[.,]\d)'
+)
+_CURRENCY = r'birr|br\.?|etb|ብር|usd|\$'
+# A currency before the amount must start a word, so "Abebr 12" is not 12 birr
+_CURRENCY_PREFIX = r'\b(?:birr|br\.?|etb|usd)|ብር|\$'
+
+# A single pattern so each message is scanned once for both products and prices
+_TOKEN_PATTERN = re.compile(
+    rf'(?P<product>\b(?:{"|".join(PRODUCT_TOKENS)})s?\b)'
+    rf'|(?P<amount_before>{_AMOUNT})\s*(?P<currency_after>{_CURRENCY})(?![a-z])'
+    rf'|(?P<currency_before>{_CURRENCY_PREFIX})\s*:?\s*(?P<amount_after>{_AMOUNT})',
+    re.IGNORECASE,
+)
+
+
+def extract_prices(message_text: str) -> List[Dict[str, Any]]:
+    """
+    Extract price mentions from a message and link each to the nearest product token.
+
+    Args:
+        message_text (str): The message text.
+
+    Returns:
+        List[Dict[str, Any]]: One dict per price with match_index, amount, currency,
+        product (or None) and the raw matched text.
+    """
+    if not message_text:
+        return []
+
+    products, prices = [], []
+    for match in _TOKEN_PATTERN.finditer(message_text):
+        if match.group('product'):
+            products.append((match.start(), match.group('product').lower().rstrip('s')))
+            continue
+        amount = match.group('amount_before') or match.group('amount_after')
+        currency = (match.group('currency_after') or match.group('currency_before')).lower()
+        try:
+            value = float(amount.replace(',', ''))
+        except ValueError:
+            continue
+        if value <= 0:
+            continue
+        prices.append({
+            'match_index': len(prices),
+            'position': match.start(),
+            'amount': value,
+            'currency': CURRENCY_CODES.get(currency, 'ETB'),
+            'raw_match': match.group(0),
+        })
+
+    for price in prices:
+        nearest = min(products, key=lambda p: abs(p[0] - price['position']), default=None)
+        price['product'] = nearest[1] if nearest else None
+        del price['position']
+    return prices
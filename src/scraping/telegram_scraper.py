@@ -3,9 +3,11 @@ import json
 import os
 from datetime import datetime
 from telethon import TelegramClient
-from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument
-from telethon.errors import FloodWaitError, ChannelPrivateError, UsernameNotOccupiedError
-from src.config import TELEGRAM_API_ID, TELEGRAM_API_HASH, TELEGRAM_PHONE, TELEGRAM_CHANNELS
+from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument, InputPeerChannel
+from telethon.errors import (FloodWaitError, ChannelPrivateError, UsernameNotOccupiedError,
+                             ChannelInvalidError, PeerIdInvalidError)
+from src import config
+from src.scraping.entity_cache import EntityCache
 import logging
 from typing import List, Dict, Any
 import time
@@ -21,24 +23,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Errors meaning a cached input peer is no longer valid and the username must be resolved again
+STALE_PEER_ERRORS = (ChannelInvalidError, PeerIdInvalidError, ValueError)
+
 class TelegramScraper:
     """
     A class to scrape messages and media from Telegram channels using Telethon.
     Handles authentication, message retrieval, media downloading, and error handling.
     """
-    def __init__(self):
+    def __init__(self, client=None, entity_cache: EntityCache = None):
         """
         Initialize the TelegramScraper with a Telethon client.
+
+        Args:
+            client: Client to use instead of a new TelegramClient, e.g. an offline fake for benchmarks.
+            entity_cache (EntityCache): Store of resolved channels. Defaults to the one at ENTITY_CACHE_PATH.
         """
-        self.client = TelegramClient('session', TELEGRAM_API_ID, TELEGRAM_API_HASH)
+        self.client = client or TelegramClient('session', config.TELEGRAM_API_ID, config.TELEGRAM_API_HASH)
+        self.entity_cache = entity_cache or EntityCache()
+        self.image_cache = None
     
-    async def scrape_channel(self, channel_name: str, limit: int = 100) -> List[Dict[str, Any]]:
+    async def _resolve_channel(self, channel_name: str):
+        """
+        Get an input peer for a channel, resolving its username only on a cache miss.
+
+        Args:
+            channel_name (str): The Telegram channel username.
+
+        Returns:
+            tuple: (peer, from_cache), where from_cache tells whether the peer came from the cache.
+        """
+        entry = self.entity_cache.get(channel_name)
+        if entry is not None:
+            return InputPeerChannel(channel_id=entry['id'], access_hash=entry['access_hash']), True
+        
+        entity = await self.client.get_entity(channel_name)
+        self.entity_cache.put(channel_name, entity)
+        logger.info(f"Resolved channel {channel_name} (id {entity.id})")
+        return entity, False
+    
+    async def scrape_channel(self, channel_name: str, limit: int = 100,
+                             start_date: datetime = None, end_date: datetime = None,
+                             media_queue: asyncio.Queue = None) -> List[Dict[str, Any]]:
         """
         Scrape messages from a specified Telegram channel.
 
         Args:
             channel_name (str): The Telegram channel username or ID.
-            limit (int): Maximum number of messages to scrape.
+            limit (int): Maximum number of messages to scrape, or None for no limit.
+            start_date (datetime): Only scrape messages posted at or after this time.
+            end_date (datetime): Only scrape messages posted before this time.
+            media_queue (asyncio.Queue): If given, each downloaded media path is put on this
+                queue as soon as it is on disk. A bounded queue throttles scraping to the consumer.
 
         Returns:
             List[Dict[str, Any]]: List of message data dictionaries.
@@ -48,13 +84,17 @@ class TelegramScraper:
         max_retries = 3
         
         while retry_count < max_retries:
+            from_cache = False
             try:
                 logger.info(f"Starting scrape for channel: {channel_name} (attempt {retry_count + 1})")
-                await self.client.start(phone=TELEGRAM_PHONE)
-                entity = await self.client.get_entity(channel_name)
+                await self.client.start(phone=config.TELEGRAM_PHONE)
+                entity, from_cache = await self._resolve_channel(channel_name)
                 
                 message_count = 0
-                async for message in self.client.iter_messages(entity, limit=limit):
+                async for message in self.client.iter_messages(entity, limit=limit, offset_date=end_date):
+                    # Messages are returned newest first, so stop once we pass the window
+                    if start_date and message.date and message.date < start_date:
+                        break
                     try:
                         message_data = {
                             'message_id': message.id,
@@ -76,6 +116,8 @@ class TelegramScraper:
                         if message.media and isinstance(message.media, (MessageMediaPhoto, MessageMediaDocument)):
                             media_path = await self._download_media(message, channel_name)
                             message_data['media_path'] = media_path
+                            if media_queue is not None and media_path:
+                                await media_queue.put(media_path)
                         
                         messages_data.append(message_data)
                         message_count += 1
@@ -99,6 +141,7 @@ class TelegramScraper:
                 
             except ChannelPrivateError:
                 logger.error(f"Channel {channel_name} is private or inaccessible")
+                self.entity_cache.invalidate(channel_name)
                 break
                 
             except UsernameNotOccupiedError:
@@ -106,6 +149,12 @@ class TelegramScraper:
                 break
                 
             except Exception as e:
+                if from_cache and isinstance(e, STALE_PEER_ERRORS):
+                    # The invalidated entry makes the next attempt resolve the username again
+                    logger.warning(f"Cached entity for {channel_name} was rejected ({e}); re-resolving")
+                    self.entity_cache.invalidate(channel_name)
+                    messages_data = []
+                    continue
                 logger.error(f"Error scraping channel {channel_name} (attempt {retry_count + 1}): {e}")
                 retry_count += 1
                 if retry_count < max_retries:
@@ -174,22 +223,57 @@ class TelegramScraper:
             
             await self.client.download_media(message, file=file_path)
             logger.info(f"Downloaded media: {filename}")
+            if config.IMAGE_CACHE_ENABLED and ext in ('.jpg', '.png'):
+                await asyncio.to_thread(self._cache_image, file_path)
+            if config.INFERENCE_SERVICE_URL and ext in ('.jpg', '.png'):
+                await self._submit_for_detection(file_path)
             return file_path
             
         except Exception as e:
             logger.error(f"Error downloading media for message {message.id}: {e}")
             return None
     
-    def save_to_json(self, data, channel_name):
+    def _cache_image(self, file_path: str):
+        """
+        Write the detector-sized letterboxed copy of a downloaded image to the image cache.
+
+        Args:
+            file_path (str): Path of the downloaded image.
+        """
+        try:
+            from src.enrichment.image_cache import ImageCache
+            if self.image_cache is None:
+                self.image_cache = ImageCache()
+            self.image_cache.add(file_path)
+        except Exception as e:
+            # The detector rebuilds missing cache entries, so this must not fail the download
+            logger.warning(f"Could not cache image {file_path}: {e}")
+    
+    async def _submit_for_detection(self, file_path: str):
+        """
+        Queue a freshly downloaded image on the detection service so it is enriched
+        right away instead of waiting for the next batch run.
+
+        Args:
+            file_path (str): Path of the downloaded image.
+        """
+        from src.enrichment.inference_client import submit_image
+        await asyncio.to_thread(submit_image, file_path)
+    
+    def save_to_json(self, data, channel_name, date_str=None):
         """
         Save scraped message data to a JSON file.
 
         Args:
             data (list): List of message data dictionaries.
             channel_name (str): The name of the channel.
+            date_str (str): Date directory to write into (YYYY-MM-DD). Defaults to today.
+
+        Returns:
+            str: The path of the written file, or None if saving failed.
         """
         try:
-            date_str = datetime.now().strftime('%Y-%m-%d')
+            date_str = date_str or datetime.now().strftime('%Y-%m-%d')
             output_dir = f"data/raw/telegram_messages/{date_str}"
             os.makedirs(output_dir, exist_ok=True)
             
@@ -198,8 +282,10 @@ class TelegramScraper:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             
             logger.info(f"Saved {len(data)} messages to {filename}")
+            return filename
         except Exception as e:
             logger.error(f"Error saving data for {channel_name}: {e}")
+            return None
 
 async def main():
     """
@@ -207,7 +293,7 @@ async def main():
     """
     scraper = TelegramScraper()
     
-    for channel in TELEGRAM_CHANNELS:
+    for channel in config.TELEGRAM_CHANNELS:
         logger.info(f"Scraping channel: {channel}")
         messages = await scraper.scrape_channel(channel, limit=100)
         scraper.save_to_json(messages, channel)
@@ -0,0 +1,236 @@
+import cProfile
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+import psutil
+from sqlalchemy import text
+from src.database import get_engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _RssSampler(threading.Thread):
+    """
+    Samples the process's resident set size while a stage runs. The OS peak (ru_maxrss)
+    covers the whole process, so later stages of a run would report an earlier stage's peak.
+    """
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = self.process.memory_info().rss
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def stop(self):
+        """Stop sampling and return the stage's peak RSS in MB."""
+        self._stopped.set()
+        self.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return round(self.peak / (1024 * 1024), 1)
+
+
+class _ErrorCounter(logging.Handler):
+    """Counts ERROR records logged while a stage runs, since most stages log and continue."""
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+class StageMetrics:
+    """
+    Metrics collected for a single pipeline stage. Stages set `items` to the number of
+    rows, messages, images or models they processed.
+    """
+    def __init__(self, stage, partition=None):
+        self.stage = stage
+        self.partition = partition
+        self.started_at = datetime.now()
+        self.items = 0
+        self.wall_time = None
+        self.peak_rss_mb = None
+        self.error_count = 0
+        self.error = None
+
+    @property
+    def throughput(self):
+        """Items processed per second of wall time."""
+        if not self.wall_time:
+            return None
+        return round(self.items / self.wall_time, 3)
+
+
+class PipelineRun:
+    """
+    Records a pipeline run and its per-stage metrics in the monitoring schema,
+    optionally writing a cProfile dump for each stage.
+    """
+    def __init__(self, run_id=None, source='cli', profile_dir=None):
+        """
+        Initialize a pipeline run.
+
+        Args:
+            run_id (str): Identifier for the run. Generated if not given.
+            source (str): What launched the run, e.g. 'cli' or 'dagster'.
+            profile_dir (str): Directory to write per-stage cProfile output to, or None.
+        """
+        self.run_id = run_id or uuid.uuid4().hex
+        self.source = source
+        self.profile_dir = profile_dir
+        self.stages = []
+        self._registered = False
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @property
+    def engine(self):
+        # Resolved lazily so a run without database settings still executes, just unrecorded
+        return get_engine()
+
+    def create_tables(self):
+        """Create the run and stage metrics tables if they do not exist."""
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                CREATE SCHEMA IF NOT EXISTS monitoring;
+                CREATE TABLE IF NOT EXISTS monitoring.pipeline_runs (
+                    run_id TEXT PRIMARY KEY,
+                    source VARCHAR(50),
+                    status VARCHAR(20) DEFAULT 'running',
+                    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    finished_at TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS monitoring.pipeline_stage_metrics (
+                    id SERIAL PRIMARY KEY,
+                    run_id TEXT REFERENCES monitoring.pipeline_runs (run_id),
+                    stage VARCHAR(50),
+                    partition_key TEXT,
+                    started_at TIMESTAMP,
+                    wall_time_seconds FLOAT,
+                    items_processed BIGINT,
+                    throughput_per_second FLOAT,
+                    peak_rss_mb FLOAT,
+                    error_count INTEGER,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_pipeline_stage_metrics_stage
+                    ON monitoring.pipeline_stage_metrics (stage, started_at);
+            """))
+            conn.commit()
+
+    def _register(self):
+        """Insert the run row once; several Dagster steps may share a run id."""
+        if self._registered:
+            return
+        self.create_tables()
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO monitoring.pipeline_runs (run_id, source)
+                VALUES (:run_id, :source)
+                ON CONFLICT (run_id) DO NOTHING
+            """), {'run_id': self.run_id, 'source': self.source})
+            conn.commit()
+        self._registered = True
+
+    @contextmanager
+    def stage(self, name, partition=None):
+        """
+        Time a pipeline stage and record its metrics when it finishes.
+
+        Args:
+            name (str): Stage name, e.g. 'scraping' or 'loading'.
+            partition (str): Partition key when the stage handles a single partition.
+
+        Yields:
+            StageMetrics: Set `items` on it to record how much work the stage did.
+        """
+        metrics = StageMetrics(name, partition)
+        profiler = cProfile.Profile() if self.profile_dir else None
+        error_counter = _ErrorCounter()
+        logging.getLogger().addHandler(error_counter)
+        rss_sampler = _RssSampler()
+        rss_sampler.start()
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield metrics
+        except Exception as e:
+            metrics.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            logging.getLogger().removeHandler(error_counter)
+            metrics.error_count = error_counter.count
+            if profiler:
+                profiler.disable()
+                suffix = f"_{partition}".replace('|', '_') if partition else ''
+                profile_path = os.path.join(self.profile_dir, f"{self.run_id}_{name}{suffix}.prof")
+                profiler.dump_stats(profile_path)
+                logger.info(f"Wrote profile for stage {name} to {profile_path}")
+            metrics.wall_time = time.perf_counter() - start
+            metrics.peak_rss_mb = rss_sampler.stop()
+            self.stages.append(metrics)
+            self._record(metrics)
+
+    def _record(self, metrics):
+        """Persist a finished stage's metrics, never failing the pipeline on error."""
+        logger.info(
+            f"Stage {metrics.stage}: {metrics.wall_time:.2f}s, {metrics.items} items, "
+            f"{metrics.throughput} items/s, peak RSS {metrics.peak_rss_mb} MB, {metrics.error_count} errors"
+            + (f", error: {metrics.error}" if metrics.error else "")
+        )
+        try:
+            self._register()
+            with self.engine.connect() as conn:
+                conn.execute(text("""
+                    INSERT INTO monitoring.pipeline_stage_metrics
+                    (run_id, stage, partition_key, started_at, wall_time_seconds, items_processed,
+                     throughput_per_second, peak_rss_mb, error_count, error)
+                    VALUES (:run_id, :stage, :partition_key, :started_at, :wall_time, :items,
+                            :throughput, :peak_rss_mb, :error_count, :error)
+                """), {
+                    'run_id': self.run_id,
+                    'stage': metrics.stage,
+                    'partition_key': metrics.partition,
+                    'started_at': metrics.started_at,
+                    'wall_time': metrics.wall_time,
+                    'items': metrics.items,
+                    'throughput': metrics.throughput,
+                    'peak_rss_mb': metrics.peak_rss_mb,
+                    'error_count': metrics.error_count,
+                    'error': metrics.error,
+                })
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error recording metrics for stage {metrics.stage}: {e}")
+
+    def finish(self, status=None):
+        """
+        Mark the run finished.
+
+        Args:
+            status (str): Final status. Defaults to 'failed' if any stage raised, else 'succeeded'.
+        """
+        if status is None:
+            status = 'failed' if any(s.error for s in self.stages) else 'succeeded'
+        try:
+            self._register()
+            with self.engine.connect() as conn:
+                conn.execute(text("""
+                    UPDATE monitoring.pipeline_runs
+                    SET status = :status, finished_at = CURRENT_TIMESTAMP
+                    WHERE run_id = :run_id
+                """), {'run_id': self.run_id, 'status': status})
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error finishing pipeline run {self.run_id}: {e}")
@@ -0,0 +1,164 @@
+import shutil
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from dotenv import load_dotenv
+from dbt.cli.main import dbtRunner
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DBT_PROJECT_DIR = Path(__file__).resolve().parents[2] / "dbt_project"
+
+# Selectors for the part of the DAG fed by each raw source
+SOURCE_SELECTORS = {
+    'messages': 'source:raw.telegram_messages+',
+    'prices': 'source:raw.message_prices+',
+    'detections': 'source:raw.image_detections+',
+}
+
+
+class DbtRunner:
+    """
+    Runs dbt in-process with a manifest that is parsed once and reused.
+    Supports selective builds of the models downstream of changed sources.
+    """
+    def __init__(self, project_dir: Path = DBT_PROJECT_DIR, profiles_dir: Optional[Path] = None):
+        """
+        Initialize the runner for a dbt project.
+
+        Args:
+            project_dir (Path): Path to the dbt project.
+            profiles_dir (Path): Directory containing profiles.yml. Defaults to project_dir.
+        """
+        load_dotenv()
+        self.project_dir = Path(project_dir)
+        self.profiles_dir = Path(profiles_dir or project_dir)
+        self.state_dir = self.project_dir / "target" / "last_build_state"
+        self._manifest = None
+
+    def _invoke(self, args: List[str]):
+        """Invoke a dbt command against the project, reusing the cached manifest."""
+        runner = dbtRunner(manifest=self._manifest)
+        return runner.invoke(args + [
+            "--project-dir", str(self.project_dir),
+            "--profiles-dir", str(self.profiles_dir),
+        ])
+
+    def ensure_deps(self):
+        """Install the project's packages (e.g. dbt_utils) if they aren't installed yet."""
+        packages_dir = self.project_dir / "dbt_packages"
+        if not (self.project_dir / "packages.yml").exists():
+            return
+        if packages_dir.is_dir() and any(packages_dir.iterdir()):
+            return
+        logger.info(f"Installing dbt packages into {packages_dir}")
+        result = self._invoke(["deps"])
+        if not result.success:
+            raise RuntimeError(f"dbt deps failed: {result.exception}")
+
+    @property
+    def manifest(self):
+        """The parsed project manifest, parsed on first access."""
+        if self._manifest is None:
+            self.ensure_deps()
+            result = self._invoke(["parse"])
+            if not result.success:
+                raise RuntimeError(f"dbt parse failed: {result.exception}")
+            self._manifest = result.result
+        return self._manifest
+
+    def reload(self):
+        """Drop the cached manifest so the next run re-parses the project."""
+        self._manifest = None
+
+    def build(self, select: Optional[List[str]] = None, full_refresh: bool = False,
+              extra_args: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Run and test the selected models in DAG order with `dbt build`.
+
+        Args:
+            select (List[str]): dbt selectors; builds the whole project when empty.
+            full_refresh (bool): Rebuild incremental models from scratch.
+            extra_args (List[str]): Additional CLI arguments passed through to dbt.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per node with its status and timing.
+        """
+        self.manifest  # Parse up front so the build reuses the cached manifest
+        args = ["build"]
+        if select:
+            args += ["--select", " ".join(select)]
+        if full_refresh:
+            args.append("--full-refresh")
+        args += extra_args or []
+
+        result = self._invoke(args)
+        if result.exception is not None:
+            raise RuntimeError(f"dbt build failed: {result.exception}")
+
+        node_results = [
+            {
+                'unique_id': r.node.unique_id,
+                'resource_type': str(r.node.resource_type),
+                'status': str(r.status),
+                'execution_time': r.execution_time,
+                'rows_affected': (r.adapter_response or {}).get('rows_affected'),
+                'message': r.message,
+            }
+            for r in result.result.results
+        ]
+        for r in node_results:
+            logger.info(f"{r['unique_id']}: {r['status']} in {r['execution_time']:.2f}s")
+        if not result.success:
+            failed = [r['unique_id'] for r in node_results if r['status'] in ('error', 'fail')]
+            logger.error(f"dbt build finished with failures: {failed}")
+        return node_results
+
+    def build_sources(self, *sources: str) -> List[Dict[str, Any]]:
+        """
+        Build only the models downstream of the named raw sources.
+
+        Args:
+            *sources (str): Keys of SOURCE_SELECTORS, e.g. 'messages' or 'detections'.
+
+        Returns:
+            List[Dict[str, Any]]: Per-node results as returned by build().
+        """
+        return self.build(select=[SOURCE_SELECTORS[s] for s in sources])
+
+    def build_changed(self) -> List[Dict[str, Any]]:
+        """
+        Build only the models downstream of sources that received new data since the
+        last successful call, using dbt's source freshness state. The first call builds
+        everything.
+
+        Returns:
+            List[Dict[str, Any]]: Per-node results as returned by build().
+        """
+        self.manifest
+        freshness = self._invoke(["source", "freshness"])
+        if freshness.exception is not None:
+            raise RuntimeError(f"dbt source freshness failed: {freshness.exception}")
+
+        if (self.state_dir / "sources.json").exists():
+            results = self.build(select=["source_status:fresher+"],
+                                 extra_args=["--state", str(self.state_dir)])
+        else:
+            results = self.build()
+
+        if all(r['status'] not in ('error', 'fail') for r in results):
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy(self.project_dir / "target" / "sources.json", self.state_dir / "sources.json")
+        return results
+
+
+_runner = None
+
+
+def get_dbt_runner() -> DbtRunner:
+    """Return the process-wide DbtRunner so the parsed manifest is shared."""
+    global _runner
+    if _runner is None:
+        _runner = DbtRunner()
+    return _runner
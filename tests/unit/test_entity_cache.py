@@ -0,0 +1,83 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.scraping.entity_cache import EntityCache
+
+
+def _entity(channel_id):
+    return SimpleNamespace(id=channel_id, access_hash=channel_id * 10, title=f"channel {channel_id}")
+
+
+def _age_entry(path, key, days):
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    entries[key]['resolved_at'] = (datetime.now() - timedelta(days=days)).isoformat()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+
+
+def test_put_then_get_from_a_new_instance(tmp_path):
+    path = str(tmp_path / "entities.json")
+    EntityCache(path, ttl_days=30).put("@CheMed123", _entity(1))
+
+    entry = EntityCache(path, ttl_days=30).get("chemed123")
+    assert (entry['id'], entry['access_hash'], entry['title']) == (1, 10, "channel 1")
+
+
+def test_expired_entry_is_not_returned(tmp_path):
+    path = str(tmp_path / "entities.json")
+    EntityCache(path, ttl_days=1).put("chemed123", _entity(1))
+    _age_entry(path, "chemed123", days=2)
+
+    assert EntityCache(path, ttl_days=1).get("chemed123") is None
+    assert EntityCache(path, ttl_days=3).get("chemed123")['id'] == 1
+
+
+def test_zero_ttl_never_expires(tmp_path):
+    path = str(tmp_path / "entities.json")
+    EntityCache(path, ttl_days=0).put("chemed123", _entity(1))
+    _age_entry(path, "chemed123", days=3650)
+
+    assert EntityCache(path, ttl_days=0).get("chemed123")['id'] == 1
+
+
+def test_writes_merge_entries_saved_by_other_instances(tmp_path):
+    path = str(tmp_path / "entities.json")
+    first, second = EntityCache(path), EntityCache(path)
+    # Both load the empty file before either writes
+    assert first.get("one") is None and second.get("two") is None
+
+    first.put("one", _entity(1))
+    second.put("two", _entity(2))
+
+    merged = EntityCache(path)
+    assert merged.get("one")['id'] == 1
+    assert merged.get("two")['id'] == 2
+
+
+def test_invalidate_removes_entry_missing_from_stale_local_copy(tmp_path):
+    path = str(tmp_path / "entities.json")
+    stale = EntityCache(path)
+    assert stale.get("one") is None
+
+    EntityCache(path).put("one", _entity(1))
+    EntityCache(path).put("two", _entity(2))
+    stale.invalidate("one")
+
+    remaining = EntityCache(path)
+    assert remaining.get("one") is None
+    assert remaining.get("two")['id'] == 2
+
+
+def test_unreadable_file_is_treated_as_empty(tmp_path):
+    path = tmp_path / "entities.json"
+    path.write_text("{not json", encoding='utf-8')
+
+    cache = EntityCache(str(path))
+    assert cache.get("one") is None
+    cache.put("one", _entity(1))
+    assert EntityCache(str(path)).get("one")['id'] == 1
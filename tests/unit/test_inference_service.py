@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("fastapi")
+pytest.importorskip("ultralytics")
+
+from src.enrichment.inference_service import MicroBatcher
+
+
+class StubDetector:
+    """Records calls in place of YOLODetector; no model or database."""
+    def __init__(self, processed=(), fail_batch=False):
+        self.processed = {self.canonical_image_path(path) for path in processed}
+        self.fail_batch = fail_batch
+        self.batch_calls, self.single_calls, self.stored = [], [], []
+
+    @staticmethod
+    def canonical_image_path(image_path):
+        return "/".join(os.path.normpath(os.path.abspath(image_path)).split(os.sep)[-3:])
+
+    def message_id_from_path(self, image_path):
+        try:
+            return int(os.path.basename(image_path).split('_')[0])
+        except ValueError:
+            return None
+
+    def is_image_processed(self, image_path):
+        return self.canonical_image_path(image_path) in self.processed
+
+    def _detections(self, image_path):
+        return [{'class_name': 'bottle', 'confidence': 0.9, 'bbox': [0, 0, 1, 1], 'image': image_path}]
+
+    def detect_objects_in_images(self, image_paths):
+        self.batch_calls.append(list(image_paths))
+        if self.fail_batch:
+            raise RuntimeError("unreadable image in batch")
+        return [self._detections(path) for path in image_paths]
+
+    def detect_objects_in_image(self, image_path):
+        self.single_calls.append(image_path)
+        return self._detections(image_path)
+
+    def store_detections(self, message_id, image_path, detections):
+        self.stored.append((message_id, image_path))
+
+
+def _image(channel, message_id):
+    return f"data/raw/media/{channel}/2024-01-01/{message_id}_1704067200.jpg"
+
+
+def test_next_batch_cuts_at_max_size():
+    async def scenario():
+        batcher = MicroBatcher(StubDetector(), max_batch_size=3, max_wait_ms=5000)
+        for message_id in range(5):
+            await batcher.submit(_image("chemed123", message_id))
+        start = time.monotonic()
+        batch = await batcher._next_batch()
+        return batch, time.monotonic() - start, batcher.queue.qsize()
+
+    batch, elapsed, remaining = asyncio.run(scenario())
+    assert [path for path, _ in batch] == [_image("chemed123", i) for i in range(3)]
+    assert remaining == 2
+    # A full batch is dispatched without waiting out max_wait
+    assert elapsed < 1
+
+
+def test_next_batch_cuts_at_max_wait():
+    async def scenario():
+        batcher = MicroBatcher(StubDetector(), max_batch_size=10, max_wait_ms=50)
+        await batcher.submit(_image("chemed123", 1))
+        await batcher.submit(_image("chemed123", 2))
+
+        async def late_submit():
+            await asyncio.sleep(0.5)
+            await batcher.submit(_image("chemed123", 3))
+
+        late = asyncio.create_task(late_submit())
+        start = time.monotonic()
+        batch = await batcher._next_batch()
+        elapsed = time.monotonic() - start
+        await late
+        return batch, elapsed, batcher.queue.qsize()
+
+    batch, elapsed, remaining = asyncio.run(scenario())
+    assert [path for path, _ in batch] == [_image("chemed123", 1), _image("chemed123", 2)]
+    assert 0.04 <= elapsed < 0.5
+    assert remaining == 1
+
+
+def test_process_dedupes_paths_to_the_same_image():
+    detector = StubDetector()
+    batcher = MicroBatcher(detector)
+    path = _image("chemed123", 1)
+    same_image = os.path.join(os.getcwd(), path)
+    # Same message id in another channel is a different image
+    other_channel = _image("tikvahpharma", 1)
+
+    results = batcher._process([path, path, same_image, other_channel])
+
+    assert detector.batch_calls == [[path, other_channel]]
+    assert detector.stored == [(1, path), (1, other_channel)]
+    assert results[same_image] == []
+    assert len(results[path]) == 1 and len(results[other_channel]) == 1
+    assert batcher.stats == {'batches': 1, 'images': 2, 'skipped': 1}
+
+
+def test_process_skips_processed_and_unparseable_images():
+    done, new = _image("chemed123", 1), _image("chemed123", 2)
+    detector = StubDetector(processed=[done])
+    batcher = MicroBatcher(detector)
+    not_a_message = "data/raw/media/chemed123/2024-01-01/photo.jpg"
+
+    results = batcher._process([done, new, not_a_message])
+
+    assert detector.batch_calls == [[new]]
+    assert detector.stored == [(2, new)]
+    assert results[done] == [] and results[not_a_message] == []
+    assert batcher.stats['skipped'] == 2
+
+
+def test_process_skips_inference_when_nothing_is_pending():
+    done = _image("chemed123", 1)
+    detector = StubDetector(processed=[done])
+    batcher = MicroBatcher(detector)
+
+    assert batcher._process([done]) == {done: []}
+    assert detector.batch_calls == []
+    assert batcher.stats['batches'] == 0
+
+
+def test_process_falls_back_to_per_image_inference_when_batch_fails():
+    detector = StubDetector(fail_batch=True)
+    batcher = MicroBatcher(detector)
+    paths = [_image("chemed123", 1), _image("chemed123", 2)]
+
+    results = batcher._process(paths)
+
+    assert detector.batch_calls == [paths]
+    assert detector.single_calls == paths
+    assert detector.stored == [(1, paths[0]), (2, paths[1])]
+    assert all(len(results[path]) == 1 for path in paths)
+    assert batcher.stats == {'batches': 1, 'images': 2, 'skipped': 0}
@@ -0,0 +1,62 @@
+import pytest
+from src.scraping.price_extractor import extract_prices
+
+
+@pytest.mark.parametrize("text, amount, currency", [
+    ("Paracetamol 120 birr", 120.0, 'ETB'),
+    ("Vitamin C 1,200.50 Birr", 1200.5, 'ETB'),
+    ("Syrup 85.5 br.", 85.5, 'ETB'),
+    ("Br. 45 per tablet", 45.0, 'ETB'),
+    ("ETB: 350 for the cream", 350.0, 'ETB'),
+    ("150ብር serum", 150.0, 'ETB'),
+    ("Sunscreen $20", 20.0, 'USD'),
+    ("Perfume 30 USD", 30.0, 'USD'),
+])
+def test_extracts_amount_and_currency(text, amount, currency):
+    prices = extract_prices(text)
+    assert len(prices) == 1
+    assert prices[0]['amount'] == amount
+    assert prices[0]['currency'] == currency
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    None,
+    "Call 0911234567 for delivery",
+    "1.500 birr",        # amount must not start mid-number
+    "2,50 birr",
+    "Abebr 12 pieces",   # 'br' inside a word is not a currency
+    "12 brand new masks",
+    "0 birr",
+])
+def test_ignores_non_prices(text):
+    assert extract_prices(text) == []
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("Call +251911234567 Birr 250", 250.0),
+    ("📞0911234567 birr 80", 80.0),
+])
+def test_phone_number_before_currency_is_not_a_price(text, amount):
+    prices = extract_prices(text)
+    assert [p['amount'] for p in prices] == [amount]
+
+
+@pytest.mark.parametrize("text", [
+    "12,345,678 birr",
+    "Birr 25191123456",
+])
+def test_ignores_implausibly_large_amounts(text):
+    assert extract_prices(text) == []
+
+
+def test_links_each_price_to_nearest_product():
+    prices = extract_prices("Aspirin 50 birr, Ibuprofen tablets 75 birr")
+    assert [(p['product'], p['amount']) for p in prices] == [('aspirin', 50.0), ('tablet', 75.0)]
+    assert [p['match_index'] for p in prices] == [0, 1]
+
+
+def test_price_without_product():
+    prices = extract_prices("Only 200 birr today")
+    assert prices[0]['product'] is None
+    assert prices[0]['raw_match'] == "200 birr"
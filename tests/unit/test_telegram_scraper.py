@@ -0,0 +1,63 @@
+import asyncio
+import zlib
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("telethon")
+pytest.importorskip("PIL")  # benchmarks.synthetic draws the sample images
+
+from src import config
+
+
+@pytest.fixture
+def scraper_env(tmp_path, monkeypatch):
+    """Run in a scratch directory with no image cache, detection service or real sleeps."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+    monkeypatch.setattr(config, 'IMAGE_CACHE_ENABLED', False)
+    monkeypatch.setattr(config, 'INFERENCE_SERVICE_URL', None)
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(asyncio, 'sleep', fake_sleep)
+    return sleeps
+
+
+def _scraper(tmp_path, channel_name, cached_id):
+    from benchmarks.fake_telegram import FakeTelegramClient
+    from src.scraping.entity_cache import EntityCache
+    from src.scraping.telegram_scraper import TelegramScraper
+
+    cache = EntityCache(str(tmp_path / "entities.json"))
+    cache._save(channel_name.lower(), {
+        'id': cached_id, 'access_hash': 0, 'title': channel_name, 'resolved_at': '2099-01-01T00:00:00',
+    })
+    client = FakeTelegramClient(messages_per_channel=5)
+    return TelegramScraper(client=client, entity_cache=cache), client, cache
+
+
+def test_stale_cached_peer_is_invalidated_and_resolved_again(tmp_path, scraper_env):
+    scraper, client, cache = _scraper(tmp_path, "chemed123", cached_id=12345)
+
+    messages = asyncio.run(scraper.scrape_channel("chemed123", limit=5))
+
+    assert len(messages) == 5
+    # The cached peer was rejected once, then the username was resolved and cached again
+    assert client.calls['iter_messages'] == 2
+    assert client.calls['get_entity'] == 1
+    assert cache.get("chemed123")['id'] == zlib.crc32(b"chemed123")
+    # No retry was used up, so there was no backoff
+    assert scraper_env == []
+
+
+def test_valid_cached_peer_skips_resolution(tmp_path, scraper_env):
+    scraper, client, _ = _scraper(tmp_path, "chemed123", cached_id=zlib.crc32(b"chemed123"))
+    client._channel("chemed123")
+
+    messages = asyncio.run(scraper.scrape_channel("chemed123", limit=5))
+
+    assert len(messages) == 5
+    assert client.calls['get_entity'] == 0
+    assert client.calls['iter_messages'] == 1